@@ -5,15 +5,22 @@ Entry point. Run with:
     streamlit run app.py
 """
 
+import contextlib
 import os
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 import altair as alt
 
-from sittingcc.data import load_data
-from sittingcc.features import compute_features
-from sittingcc.scoring import compute_score, score_dataframe
-from sittingcc.recommendation import get_full_recommendation
+from sittingcc import instrument
+from sittingcc.chart import trend_data
+from sittingcc.data import ATHLETE_COLUMN
+from sittingcc.pipeline import pipeline_key, run_pipeline_tail
+from sittingcc.scoring import CONTRIBUTION_COLUMNS, weights_version
+from sittingcc.recommendation import TIERS, get_full_recommendation
+from sittingcc.table import PAGE_SIZE, TABLE_COLUMNS, format_page, iter_csv, page_count, select_rows
 
 # ── Page config ──────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -175,34 +182,112 @@ else:
     st.info("No file uploaded — showing sample data (30 days of synthetic training data).")
 
 
+# ── Diagnostics toggle ────────────────────────────────────────────────────────
+# Recording is scoped to this session: instrument.recording() only sees calls
+# made by this session's script thread, and records are kept in session_state.
+# Process-wide instrument.enable() (and tracemalloc) is left to the operator.
+# Cached pipeline results are not recomputed, so they add no new records.
+show_diagnostics = st.sidebar.toggle(
+    "Pipeline diagnostics",
+    help="Record this session's per-stage timings and row counts.",
+)
+
+
+@contextlib.contextmanager
+def session_diagnostics() -> Iterator[None]:
+    """Record the enclosed pipeline calls into this session's diagnostics."""
+    if not show_diagnostics:
+        yield
+        return
+    diag = st.session_state.setdefault("diagnostics", {"stages": [], "counters": {}})
+    with instrument.recording() as recorded:
+        try:
+            yield
+        finally:
+            diag["stages"] = (diag["stages"] + recorded["stages"])[-instrument.MAX_RECORDS:]
+            for name, n in recorded["counters"].items():
+                diag["counters"][name] = diag["counters"].get(name, 0) + n
+
+
 # ── Load + Process ─────────────────────────────────────────────────────────────
+# Pipeline output is cached per process and shared across sessions, keyed by
+# file content hash + scoring weights version. Cached frames are read-only:
+# everything below derives new frames instead of mutating them.
+# Only the last HISTORY_SPANS[0] days (plus rolling-window warm-up rows) are
+# read and scored up front, so today's score does not wait for years of
+# history. A wider chart range or an earlier table start date loads the next
+# larger span. Files that cannot be read from the tail (multi-athlete,
+# unsorted) are scored whole once, and that frame serves every span.
+PIPELINE_CACHE_ENTRIES = 16
+HISTORY_SPANS = [30, 90, 365, None]   # days back from the latest row; None = all
+
+
+def history_span(days: Optional[int]) -> Optional[int]:
+    """Smallest loadable span covering the last `days` days (None = all)."""
+    if days is None:
+        return None
+    return next((span for span in HISTORY_SPANS[:-1] if span >= days), None)
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES * len(HISTORY_SPANS), show_spinner=False)
+def cached_pipeline(key: str, span: Optional[int], _data: bytes) -> pd.DataFrame:
+    """Scored upload, last `span` days; `key` is pipeline_key(_data), so the bytes are not re-hashed."""
+    return run_pipeline_tail(_data, span)
+
+
+@st.cache_resource(show_spinner=False)
+def sample_pipeline(weights: str, span: Optional[int]) -> pd.DataFrame:
+    """Scored sample dataset, computed once per process per weights version and span."""
+    return run_pipeline_tail(SAMPLE_PATH, span)
+
+
+def load_span(span: Optional[int]) -> pd.DataFrame:
+    with session_diagnostics():
+        if uploaded_file:
+            return cached_pipeline(upload_key, span, data)
+        return sample_pipeline(weights_version(), span)
+
+
 try:
-    df_raw = load_data(filepath)
-    df_feat = compute_features(df_raw)
-    df_scored = score_dataframe(df_feat)
+    if uploaded_file:
+        data = uploaded_file.getvalue()
+        upload_key = data_key = pipeline_key(data)
+    else:
+        data_key = f"sample:{weights_version()}"
+    df_scored = load_span(HISTORY_SPANS[0])
 except Exception as e:
     st.error(f"Error loading data: {e}")
     st.stop()
+complete_history = df_scored.attrs["complete_history"]
+history_start = df_scored.attrs["history_start"]
+
+# Multi-athlete tables: features were computed per athlete, show one at a time
+if ATHLETE_COLUMN in df_scored.columns:
+    athlete = st.selectbox("Athlete", df_scored[ATHLETE_COLUMN].unique())
+    df_scored = df_scored[df_scored[ATHLETE_COLUMN] == athlete]
+    data_key = f"{data_key}:{athlete}"
+    history_start = df_scored["date"].iloc[0].strftime("%Y-%m-%d")
 
 # Drop rows without enough rolling history to score
-df_valid = df_scored.dropna(subset=["readiness_score"]).copy()
+df_valid = df_scored.dropna(subset=["readiness_score"])
 
 if df_valid.empty:
     st.error("Not enough data to compute scores. Need at least 3 days of data.")
     st.stop()
 
-# Add recommendations column for the table
-recs = []
-for _, row in df_valid.iterrows():
-    _, contributions = compute_score(row)
-    rec, _ = get_full_recommendation(row["readiness_score"], contributions)
-    recs.append(rec["label"])
-df_valid["recommendation"] = recs
+
+def valid_history(days: Optional[int]) -> Tuple[pd.DataFrame, str]:
+    """Scored rows covering at least the last `days` days (None = all), and their cache key."""
+    span = history_span(days)
+    if complete_history or span == HISTORY_SPANS[0]:
+        return df_valid, data_key
+    return load_span(span).dropna(subset=["readiness_score"]), f"{data_key}:{span}"
 
 
 # ── Today's Analysis (most recent row) ────────────────────────────────────────
 latest = df_valid.iloc[-1]
-today_score, today_contribs = compute_score(latest)
+today_score = float(latest["readiness_score"])
+today_contribs = {label: float(latest[col]) for label, col in CONTRIBUTION_COLUMNS.items()}
 today_rec, today_explanation = get_full_recommendation(today_score, today_contribs)
 
 # Score color
@@ -269,80 +354,171 @@ st.html(
 
 
 # ── Trend Chart ────────────────────────────────────────────────────────────────
-st.markdown("<div class='section-header'>30-Day Trend</div>", unsafe_allow_html=True)
-
-chart_df = df_valid[["date", "readiness_score", "strain"]].copy()
-chart_df["date"] = pd.to_datetime(chart_df["date"])
-
-# Normalize strain to 0–100 scale for visual comparison
-strain_max = chart_df["strain"].max()
-chart_df["strain_normalized"] = (chart_df["strain"] / strain_max * 100).round(1)
-
-# Melt for Altair
-melted = chart_df.melt(
-    id_vars="date",
-    value_vars=["readiness_score", "strain_normalized"],
-    var_name="metric",
-    value_name="value"
-)
-melted["metric"] = melted["metric"].map({
-    "readiness_score": "Readiness Score",
-    "strain_normalized": "Strain (normalized)"
-})
-
-color_scale = alt.Scale(
-    domain=["Readiness Score", "Strain (normalized)"],
-    range=["#2ecc71", "#e74c3c"]
-)
-
-chart = alt.Chart(melted).mark_line(
-    interpolate="monotone",
-    strokeWidth=2.5
-).encode(
-    x=alt.X("date:T", title=None, axis=alt.Axis(labelColor="#666", gridColor="#1e1e1e")),
-    y=alt.Y("value:Q", title=None, scale=alt.Scale(domain=[0, 105]),
-            axis=alt.Axis(labelColor="#666", gridColor="#1e1e1e")),
-    color=alt.Color("metric:N", scale=color_scale, legend=alt.Legend(
-        orient="top-left",
-        labelColor="#aaa",
-        titleColor="#666",
-        labelFontSize=12,
-    )),
-    tooltip=["date:T", "metric:N", "value:Q"]
-).properties(
-    height=280,
-    background="#111",
-    padding={"left": 10, "right": 10, "top": 10, "bottom": 10}
-).configure_view(
-    strokeWidth=0
-)
-
-st.altair_chart(chart, use_container_width=True)
+# The chart and table below are fragments: a widget inside one reruns only that
+# section, and their derived frames are cached under the same data key.
+# Visible range → days back from the latest scored day (None = full history)
+TREND_RANGES = {"30 days": 30, "90 days": 90, "1 year": 365, "All": None}
+
+
+@st.cache_data(max_entries=PIPELINE_CACHE_ENTRIES * len(TREND_RANGES), show_spinner=False)
+def trend_chart_data(key: str, range_label: str, _df_valid: pd.DataFrame) -> pd.DataFrame:
+    """Downsampled long-format readiness + normalized strain series for Altair."""
+    days = TREND_RANGES[range_label]
+    end = _df_valid["date"].iloc[-1]
+    start = end - pd.Timedelta(days=days - 1) if days else None
+    return trend_data(_df_valid, start, end)
+
+
+@st.fragment
+def render_trend_chart(history) -> None:
+    range_label = st.radio(
+        "Trend range", list(TREND_RANGES), horizontal=True, label_visibility="collapsed",
+    )
+    # Ranges beyond the loaded span load (and cache) a wider one
+    df_range, key = history(TREND_RANGES[range_label])
+    melted = trend_chart_data(key, range_label, df_range)
+    resolution = melted.attrs.get("resolution", "daily")
+
+    title = "Full History" if TREND_RANGES[range_label] is None else f"{range_label} Trend"
+    if resolution != "daily":
+        title = f"{title} · {resolution}"
+    st.markdown(f"<div class='section-header'>{title}</div>", unsafe_allow_html=True)
+
+    color_scale = alt.Scale(
+        domain=["Readiness Score", "Strain (normalized)"],
+        range=["#2ecc71", "#e74c3c"]
+    )
+
+    chart = alt.Chart(melted).mark_line(
+        interpolate="monotone",
+        strokeWidth=2.5
+    ).encode(
+        x=alt.X("date:T", title=None, axis=alt.Axis(labelColor="#666", gridColor="#1e1e1e")),
+        y=alt.Y("value:Q", title=None, scale=alt.Scale(domain=[0, 105]),
+                axis=alt.Axis(labelColor="#666", gridColor="#1e1e1e")),
+        color=alt.Color("metric:N", scale=color_scale, legend=alt.Legend(
+            orient="top-left",
+            labelColor="#aaa",
+            titleColor="#666",
+            labelFontSize=12,
+        )),
+        tooltip=["date:T", "metric:N", "value:Q"]
+    ).properties(
+        height=280,
+        background="#111",
+        padding={"left": 10, "right": 10, "top": 10, "bottom": 10}
+    ).configure_view(
+        strokeWidth=0
+    )
+
+    st.altair_chart(chart, use_container_width=True)
+
+
+render_trend_chart(valid_history)
 
 
 # ── Data Table ─────────────────────────────────────────────────────────────────
-st.markdown("<div class='section-header'>Full Data</div>", unsafe_allow_html=True)
-
-display_df = df_valid[[
-    "date", "hrv_ms", "rhr_bpm", "sleep_hours", "sleep_score",
-    "strain", "readiness_score", "recommendation"
-]].copy()
-display_df["date"] = display_df["date"].dt.strftime("%Y-%m-%d")
-display_df["readiness_score"] = display_df["readiness_score"].round(1)
-
-st.dataframe(
-    display_df,
-    use_container_width=True,
-    hide_index=True,
-    column_config={
-        "readiness_score": st.column_config.ProgressColumn(
-            "Readiness Score",
-            min_value=0,
-            max_value=100,
-            format="%.0f",
+# Only the visible page is formatted and sent to the browser. Filtering and
+# sorting run on the typed columns and yield row positions, cached per query.
+TIER_LABELS = [tier["label"] for tier in TIERS]
+
+
+@st.cache_data(max_entries=PIPELINE_CACHE_ENTRIES * 4, show_spinner=False)
+def table_rows(key: str, query: tuple, _df_valid: pd.DataFrame) -> np.ndarray:
+    """Filtered + sorted row positions; query = select_rows() keyword items."""
+    return select_rows(_df_valid, **dict(query))
+
+
+@st.fragment
+def render_data_table(history, history_start: pd.Timestamp) -> None:
+    st.markdown("<div class='section-header'>Full Data</div>", unsafe_allow_html=True)
+
+    recent, _ = history(HISTORY_SPANS[0])
+    default_start = recent["date"].iloc[0].date()
+    last_day = recent["date"].iloc[-1].date()
+    earliest = min(history_start.date(), default_start)
+    with st.expander("Filter & sort"):
+        f1, f2, f3 = st.columns(3)
+        tiers = f1.multiselect("Tier", TIER_LABELS, default=TIER_LABELS)
+        date_range = f2.date_input(
+            "Date range", value=(default_start, last_day), min_value=earliest, max_value=last_day,
         )
-    }
-)
+        score_range = f3.slider("Score band", 0, 100, (0, 100))
+        s1, s2 = st.columns(2)
+        sort_by = s1.selectbox("Sort by", TABLE_COLUMNS)
+        descending = s2.toggle("Descending", value=True)
+
+    # A start date before the loaded span loads the span that covers it
+    start = date_range[0] if len(date_range) == 2 else default_start
+    df_valid, key = history((last_day - start).days + 1)
+    first_day = df_valid["date"].iloc[0].date()
+
+    # Unchanged filters are left out so they cost no mask pass
+    query = {"sort_by": sort_by, "descending": descending}
+    if set(tiers) != set(TIER_LABELS):
+        query["tiers"] = tuple(tiers)
+    if len(date_range) == 2 and (date_range[0], date_range[1]) != (first_day, last_day):
+        query["start"], query["end"] = date_range
+    if score_range != (0, 100):
+        query["score_range"] = score_range
+    rows = table_rows(key, tuple(sorted(query.items())), df_valid)
+
+    n_pages = page_count(len(rows))
+    p1, p2 = st.columns([1, 3])
+    page = p1.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+    lo = (page - 1) * PAGE_SIZE
+    p2.caption(f"Rows {min(lo + 1, len(rows))}–{min(lo + PAGE_SIZE, len(rows))} of {len(rows)}")
+
+    st.dataframe(
+        format_page(df_valid, rows, page),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "readiness_score": st.column_config.ProgressColumn(
+                "Readiness Score",
+                min_value=0,
+                max_value=100,
+                format="%.0f",
+            )
+        }
+    )
+
+    # Streamlit calls `data` only when the button is clicked, so the CSV is
+    # never built for a render. It covers the rows the table shows, which lie
+    # within the loaded span; pick an earlier start date to export more.
+    export_start, export_end = (query["start"], query["end"]) if "start" in query else (first_day, last_day)
+    st.download_button(
+        f"Download filtered rows, {export_start:%Y-%m-%d} to {export_end:%Y-%m-%d} (CSV)",
+        data=lambda: "".join(iter_csv(df_valid, rows)),
+        file_name="readiness_history.csv",
+        mime="text/csv",
+        disabled=not len(rows),
+    )
+
+
+render_data_table(valid_history, pd.Timestamp(history_start))
+
+
+# ── Diagnostics ────────────────────────────────────────────────────────────────
+if show_diagnostics:
+    st.markdown("<div class='section-header'>Diagnostics</div>", unsafe_allow_html=True)
+    diag = st.session_state.get("diagnostics", {"stages": [], "counters": {}})
+    if diag["stages"]:
+        stages_df = pd.DataFrame(diag["stages"])
+        stages_df["ms"] = (stages_df["seconds"] * 1000).round(2)
+        # Empty unless the operator enabled process-wide memory tracking
+        stages_df["peak_mb"] = (stages_df["peak_bytes"].astype(float) / 1e6).round(2)
+        st.dataframe(
+            stages_df[["stage", "ms", "rows_in", "rows_out", "peak_mb"]],
+            use_container_width=True,
+            hide_index=True,
+        )
+    else:
+        st.caption("No stages recorded yet — upload a file to run the pipeline.")
+    st.json(diag["counters"])
+    if st.button("Clear diagnostics"):
+        st.session_state.pop("diagnostics", None)
+        st.rerun()
 
 
 # ── Footer ─────────────────────────────────────────────────────────────────────
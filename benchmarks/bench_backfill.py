@@ -0,0 +1,57 @@
+"""
+bench_backfill.py — Core-count scaling of the resumable archive backfill.
+
+Run from the repo root:
+    python -m benchmarks.bench_backfill
+    python -m benchmarks.bench_backfill --rows 1000000 --workers 1 2 4
+
+Writes one synthetic columnar archive (default 10M athlete-days, 2,740
+athletes × 10 years) to a temporary directory, backfills it from scratch at
+each worker count, and reports wall time, rows/sec, parallel efficiency
+relative to a single worker, and the slowest / fastest worker's rows/sec.
+"""
+
+import argparse
+import os
+import tempfile
+
+from sittingcc.backfill import backfill
+from sittingcc.columnar import write_store
+from sittingcc.data import prepare_data
+
+from benchmarks.synthetic import make_history
+
+DAYS_PER_ATHLETE = 3650
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--task-rows", type=int, default=250_000)
+    args = parser.parse_args()
+
+    n_athletes = max(1, args.rows // DAYS_PER_ATHLETE)
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, "history.store")
+        write_store(prepare_data(make_history(DAYS_PER_ATHLETE, n_athletes)), store_path)
+        print(f"{n_athletes * DAYS_PER_ATHLETE:,} rows, {n_athletes:,} athletes, {cpus} CPUs\n")
+
+        print(f"{'workers':>8} {'seconds':>10} {'rows/s':>14} {'efficiency':>11} {'worker rows/s (min–max)':>26}")
+        baseline = None
+        for workers in args.workers:
+            report = backfill(store_path, os.path.join(tmp, "out"), workers=workers,
+                              task_rows=args.task_rows, restart=True)
+            elapsed = report["seconds"]
+            baseline = baseline or elapsed * workers
+            per_worker = [worker["rows_per_sec"] for worker in report["workers"]]
+            print(f"{workers:>8} {elapsed:10.2f} {report['rows_per_sec']:14,.0f} "
+                  f"{baseline / (elapsed * workers):10.0%} "
+                  f"{min(per_worker):>12,.0f} – {max(per_worker):<11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
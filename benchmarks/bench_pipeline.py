@@ -0,0 +1,185 @@
+"""
+bench_pipeline.py — Per-stage time and peak-memory benchmarks with regression compare.
+
+Run from the repo root:
+    python -m benchmarks.bench_pipeline                       # full ladder, table output
+    python -m benchmarks.bench_pipeline --sizes 30d 1y --json results.json
+    python -m benchmarks.bench_pipeline --json new.json --compare baseline.json
+
+Stages (each timed on the output of the previous one):
+    load_data                → parse a CSV written to a temp dir
+    compute_features         → rolling features
+    score_dataframe          → batch scoring
+    get_full_recommendation  → per-row tier + explanation for every scored row
+    recommend_dataframe      → the same, through the batch API
+    app_data_path            → end to end: pipeline.run_pipeline + today's
+                               recommendation, the work app.py does per upload
+
+Size ladder (athlete-days):
+    30d   → 1 athlete × 30 days
+    1y    → 1 athlete × 365 days
+    10ay  → 10 athletes × 365 days
+    1m    → 274 athletes × 3,650 days (~1M rows)
+
+Time is the best of --repeat runs; peak memory is measured in a separate run
+under tracemalloc so tracing does not inflate the timings. Data is generated
+with fixed seeds, and the JSON output records library versions and the host.
+
+--compare exits with status 1 when any stage is slower (or uses more memory)
+than the baseline by more than --threshold (default 20%).
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.data import load_data
+from sittingcc.features import compute_features
+from sittingcc.pipeline import run_pipeline
+from sittingcc.recommendation import get_full_recommendation, recommend_dataframe
+from sittingcc.scoring import CONTRIBUTION_COLUMNS, score_dataframe
+
+from benchmarks.synthetic import make_history
+
+SIZES = {
+    "30d": (30, 1),
+    "1y": (365, 1),
+    "10ay": (365, 10),
+    "1m": (3650, 274),
+}
+
+
+def recommend_rows(df: pd.DataFrame) -> List:
+    """get_full_recommendation for every scored row, as the app's history table needs."""
+    scored = df.dropna(subset=["readiness_score"])
+    contribs = scored[list(CONTRIBUTION_COLUMNS.values())].to_numpy()
+    labels = list(CONTRIBUTION_COLUMNS)
+    return [
+        get_full_recommendation(score, dict(zip(labels, row)))
+        for score, row in zip(scored["readiness_score"].to_numpy(), contribs)
+    ]
+
+
+def app_data_path(csv_path: str) -> None:
+    """The app's per-upload data work, without Streamlit rendering."""
+    df = run_pipeline(csv_path)
+    latest = df.dropna(subset=["readiness_score"]).iloc[-1]
+    contribs = {label: latest[col] for label, col in CONTRIBUTION_COLUMNS.items()}
+    get_full_recommendation(latest["readiness_score"], contribs)
+
+
+def measure(fn: Callable, repeat: int) -> Dict[str, float]:
+    """Best-of-repeat wall time and tracemalloc peak for fn()."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": min(times), "peak_mb": peak / 1e6}
+
+
+def bench_size(name: str, repeat: int, workdir: str) -> Dict[str, Dict]:
+    n_days, n_athletes = SIZES[name]
+    csv_path = os.path.join(workdir, f"{name}.csv")
+    make_history(n_days, n_athletes, seed=42).to_csv(csv_path, index=False)
+
+    raw = load_data(csv_path)
+    feat = compute_features(raw)
+    scored = score_dataframe(feat)
+
+    stages = {
+        "load_data": lambda: load_data(csv_path),
+        "compute_features": lambda: compute_features(raw),
+        "score_dataframe": lambda: score_dataframe(feat),
+        "get_full_recommendation": lambda: recommend_rows(scored),
+        "recommend_dataframe": lambda: recommend_dataframe(scored),
+        "app_data_path": lambda: app_data_path(csv_path),
+    }
+    results = {}
+    for stage, fn in stages.items():
+        results[stage] = {"rows": len(raw), **measure(fn, repeat)}
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return one message per stage/metric that regressed beyond threshold."""
+    regressions = []
+    for size, stages in current["results"].items():
+        for stage, metrics in stages.items():
+            base = baseline["results"].get(size, {}).get(stage)
+            if base is None:
+                continue
+            for metric in ("seconds", "peak_mb"):
+                if base[metric] > 0 and metrics[metric] > base[metric] * (1 + threshold):
+                    change = metrics[metric] / base[metric] - 1
+                    regressions.append(
+                        f"{size} {stage} {metric}: {base[metric]:.4g} → {metrics[metric]:.4g} (+{change:.0%})"
+                    )
+    return regressions
+
+
+def print_table(results: Dict) -> None:
+    print(f"{'size':>6} {'stage':<25} {'rows':>10} {'seconds':>10} {'rows/s':>13} {'peak MB':>9}")
+    for size, stages in results.items():
+        for stage, m in stages.items():
+            rate = m["rows"] / m["seconds"] if m["seconds"] else float("inf")
+            print(f"{size:>6} {stage:<25} {m['rows']:>10,} {m['seconds']:10.4f} {rate:13,.0f} {m['peak_mb']:9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write machine-readable results to this path")
+    parser.add_argument("--compare", help="baseline JSON from a previous --json run")
+    parser.add_argument("--threshold", type=float, default=0.20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {size: bench_size(size, args.repeat, workdir) for size in args.sizes}
+
+    output = {"environment": environment(), "results": results}
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(output, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.compare} (threshold {args.threshold:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
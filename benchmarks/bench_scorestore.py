@@ -0,0 +1,64 @@
+"""
+bench_scorestore.py — Equivalence check for the incremental score store.
+
+Run from the repo root:
+    python -m benchmarks.bench_scorestore
+    python -m benchmarks.bench_scorestore --days 3650
+
+ScoreStore.update must agree with a full rerun after appends, edits, inserts
+near the middle and the start, and prepends.
+"""
+
+import argparse
+import tempfile
+
+import pandas as pd
+
+from sittingcc.data import prepare_data
+from sittingcc.features import FEATURE_COLUMNS, compute_features
+from sittingcc.scorestore import SCORE_COLUMNS, ScoreStore
+from sittingcc.scoring import score_dataframe
+
+from benchmarks.synthetic import make_history
+
+COLUMNS = FEATURE_COLUMNS + SCORE_COLUMNS
+
+
+def check_store_updates(n_days: int = 400) -> None:
+    """
+    Update a ScoreStore from one history to another and compare with a full
+    rerun. Reused rows must match exactly; recomputed rows may differ in the
+    last digit of a rolling mean, as with compute_features_stream.
+    """
+    full = prepare_data(make_history(n_days))
+    edited = full.copy()
+    edited.loc[n_days // 2, "hrv_ms"] += 5
+    cases = {
+        "append": full.iloc[:-1],
+        "edit": edited,
+        "insert": full.drop(index=n_days // 2),
+        "insert near start": full.drop(index=5),
+        "prepend": full.iloc[1:],
+        "prepend a week": full.iloc[7:],
+    }
+    expected = score_dataframe(compute_features(full))[COLUMNS]
+    for name, before in cases.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ScoreStore(tmp)
+            store.update(before.reset_index(drop=True))
+            actual = store.update(full)[COLUMNS]
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-9)
+        report = store.report
+        print(f"store update ok: {name} ({report['reused']} reused, {report['recomputed']} recomputed)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--days", type=int, default=400, help="history length per case")
+    args = parser.parse_args()
+
+    check_store_updates(args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+bench_scoring.py — Equivalence check and throughput comparison for batch scoring.
+
+Run from the repo root:
+    python -m benchmarks.bench_scoring
+    python -m benchmarks.bench_scoring --sizes 1000 100000
+
+1. Equivalence: score_dataframe (columnar) must reproduce compute_score row by
+   row — identical scores, contributions and NaN-skips — on the sample CSV and
+   on a synthetic multi-year history.
+2. Throughput: rows/sec of the columnar path vs the original iterrows loop.
+   The iterrows loop is only timed up to ITERROWS_MAX_ROWS; beyond that it
+   would run for hours.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.data import load_data
+from sittingcc.features import compute_features
+from sittingcc.scoring import CONTRIBUTION_COLUMNS, compute_score, score_dataframe
+
+from benchmarks.synthetic import make_features, make_history
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "sample.csv")
+DEFAULT_SIZES = [1_000, 100_000, 10_000_000]
+ITERROWS_MAX_ROWS = 100_000
+
+
+def score_iterrows(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference implementation: the original per-row loop, keeping contributions."""
+    scores = []
+    contribs = {col: [] for col in CONTRIBUTION_COLUMNS.values()}
+    for _, row in df.iterrows():
+        if pd.isna(row.get("hrv_pct")) or pd.isna(row.get("rhr_delta")):
+            score, row_contribs = np.nan, {}
+        else:
+            score, row_contribs = compute_score(row)
+        scores.append(score)
+        for label, col in CONTRIBUTION_COLUMNS.items():
+            contribs[col].append(row_contribs.get(label, np.nan))
+    return pd.DataFrame({"readiness_score": scores, **contribs}, index=df.index)
+
+
+def check_equivalence(df: pd.DataFrame, name: str) -> None:
+    expected = score_iterrows(df)
+    actual = score_dataframe(df)[expected.columns]
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    scored = int(expected["readiness_score"].notna().sum())
+    print(f"equivalence ok: {name} ({len(df)} rows, {scored} scored)")
+
+
+def time_call(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    check_equivalence(compute_features(load_data(SAMPLE_PATH)), "data/sample.csv")
+    check_equivalence(compute_features(make_history(5 * 365)), "synthetic 5y history")
+    check_equivalence(make_features(20_000, seed=1), "random features")
+
+    print(f"\n{'rows':>12} {'columnar s':>12} {'rows/s':>14} {'iterrows s':>12} {'speedup':>9}")
+    for n in args.sizes:
+        df = make_features(n)
+        fast = time_call(score_dataframe, df)
+        if n <= ITERROWS_MAX_ROWS:
+            slow = time_call(score_iterrows, df)
+            slow_col, speedup = f"{slow:12.3f}", f"{slow / fast:8.0f}x"
+        else:
+            slow_col, speedup = f"{'skipped':>12}", f"{'-':>9}"
+        print(f"{n:>12,} {fast:12.4f} {n / fast:14,.0f} {slow_col} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
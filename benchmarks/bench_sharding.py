@@ -0,0 +1,48 @@
+"""
+bench_sharding.py — Core-count scaling of the multi-athlete pipeline.
+
+Run from the repo root:
+    python -m benchmarks.bench_sharding
+    python -m benchmarks.bench_sharding --rows 1000000 --workers 1 2 4
+
+Scores one long synthetic table (default 10M athlete-days, 2,740 athletes ×
+10 years) with score_athletes at each worker count and reports wall time,
+rows/sec and parallel efficiency relative to a single worker.
+"""
+
+import argparse
+import os
+import time
+
+from sittingcc.sharding import score_athletes
+
+from benchmarks.synthetic import make_history
+
+DAYS_PER_ATHLETE = 3650
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    n_athletes = max(1, args.rows // DAYS_PER_ATHLETE)
+    df = make_history(DAYS_PER_ATHLETE, n_athletes)
+    print(f"{len(df):,} rows, {n_athletes:,} athletes, {cpus} CPUs\n")
+
+    print(f"{'workers':>8} {'seconds':>10} {'rows/s':>14} {'efficiency':>11}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        score_athletes(df, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed * workers
+        print(f"{workers:>8} {elapsed:10.2f} {len(df) / elapsed:14,.0f} {baseline / (elapsed * workers):10.0%}")
+
+
+if __name__ == "__main__":
+    main()
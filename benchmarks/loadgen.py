@@ -0,0 +1,107 @@
+"""
+loadgen.py — Load generator for the asyncio ingestion server (sittingcc/ingest.py).
+
+Run from the repo root:
+    python -m benchmarks.loadgen                              # starts a local server
+    python -m benchmarks.loadgen --target 127.0.0.1:8766      # against a running one
+    python -m benchmarks.loadgen --uploads 5000 --concurrency 500 --athletes 1000
+
+Simulates the morning sync burst: --uploads CSV uploads (each an athlete's
+last --days days) from --athletes athletes, with at most --concurrency in
+flight. With fewer athletes than uploads, repeat uploads from the same athlete
+exercise coalescing. Reports p50/p99/max latency, sustained uploads/sec and
+response status counts.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import List, Tuple
+
+import numpy as np
+
+from sittingcc.ingest import IngestServer
+
+from benchmarks.synthetic import make_history
+
+
+async def upload(host: str, port: int, athlete_id: str, body: bytes) -> Tuple[int, float]:
+    """POST one CSV upload; return (status, seconds)."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f"POST /upload/{athlete_id} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: text/csv\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    return int(status_line.split()[1]), time.perf_counter() - start
+
+
+async def run_load(host: str, port: int, bodies: List[bytes], n_uploads: int, concurrency: int) -> None:
+    limit = asyncio.Semaphore(concurrency)
+    results: List[Tuple[int, float]] = []
+
+    async def one(i: int) -> None:
+        athlete = i % len(bodies)
+        async with limit:
+            results.append(await upload(host, port, f"athlete-{athlete}", bodies[athlete]))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_uploads)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([seconds for _, seconds in results]) * 1000
+    statuses = Counter(status for status, _ in results)
+    ok = statuses.get(200, 0)
+    print(f"uploads:      {n_uploads:,} in {elapsed:.2f}s ({concurrency} concurrent)")
+    print(f"throughput:   {n_uploads / elapsed:,.0f} uploads/s, {ok / elapsed:,.0f} scored/s")
+    print(f"latency (ms): p50 {np.percentile(latencies, 50):.1f}  "
+          f"p99 {np.percentile(latencies, 99):.1f}  max {latencies.max():.1f}")
+    print(f"statuses:     {dict(sorted(statuses.items()))}")
+
+
+async def main_async(args) -> None:
+    history = make_history(args.days, args.athletes, seed=1)
+    history["date"] = history["date"].dt.strftime("%Y-%m-%d")
+    bodies = [
+        group.drop(columns="athlete_id").to_csv(index=False).encode()
+        for _, group in history.groupby("athlete_id")
+    ]
+
+    server = None
+    if args.target:
+        host, port = args.target.rsplit(":", 1)
+        port = int(port)
+    else:
+        server = IngestServer(port=0, workers=args.workers, queue_size=args.queue)
+        await server.start()
+        host, port = server.host, server.port
+
+    try:
+        await run_load(host, port, bodies, args.uploads, args.concurrency)
+        if server:
+            print(f"server:       {server.stats}")
+    finally:
+        if server:
+            await server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--target", help="host:port of a running server (default: start one)")
+    parser.add_argument("--uploads", type=int, default=2000)
+    parser.add_argument("--athletes", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="local server workers")
+    parser.add_argument("--queue", type=int, default=256, help="local server queue size")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+synthetic.py — Generate synthetic wearable histories for benchmarks.
+
+Values follow the ranges of data/sample.csv (HRV ~40–80ms, RHR ~48–62bpm,
+sleep score ~50–95, strain ~2–20) with a little day-to-day noise. Output matches
+the CSV schema in sittingcc.data.REQUIRED_COLUMNS.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def make_history(n_days: int, n_athletes: int = 1, seed: int = 0) -> pd.DataFrame:
+    """
+    Return a raw history DataFrame with n_days rows per athlete.
+
+    When n_athletes > 1 an 'athlete_id' column is added and rows are grouped by
+    athlete, each athlete sorted by date.
+    """
+    rng = np.random.default_rng(seed)
+    n = n_days * n_athletes
+
+    dates = pd.date_range("2020-01-01", periods=n_days, freq="D")
+    strain = np.clip(rng.normal(11, 4, n), 2, 21).round(1)
+    df = pd.DataFrame({
+        "date": np.tile(dates.values, n_athletes),
+        "hrv_ms": np.clip(rng.normal(60, 8, n) - 0.6 * (strain - 11), 25, 110).round(0),
+        "rhr_bpm": np.clip(rng.normal(53, 2.5, n) + 0.2 * (strain - 11), 40, 75).round(0),
+        "sleep_hours": np.clip(rng.normal(7.4, 0.6, n), 4, 10).round(1),
+        "sleep_score": np.clip(rng.normal(76, 9, n), 30, 100).round(0),
+        "strain": strain,
+    })
+    if n_athletes > 1:
+        df.insert(0, "athlete_id", np.repeat(np.arange(n_athletes), n_days))
+    return df
+
+
+def make_features(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Return a DataFrame of already-derived scoring features, ~1% NaN hrv_pct.
+
+    Cheaper than running compute_features when only scoring throughput matters.
+    """
+    rng = np.random.default_rng(seed)
+    hrv_pct = rng.normal(0, 0.1, n_rows)
+    hrv_pct[rng.random(n_rows) < 0.01] = np.nan
+    return pd.DataFrame({
+        "hrv_pct": hrv_pct,
+        "rhr_delta": rng.normal(0, 2, n_rows),
+        "sleep_score": np.clip(rng.normal(76, 9, n_rows), 30, 100).round(0),
+        "strain_ratio": np.abs(rng.normal(1, 0.35, n_rows)),
+    })
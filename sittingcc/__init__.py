@@ -4,3 +4,22 @@
 #   features.py     → compute rolling features
 #   scoring.py      → calculate readiness score and contributions
 #   recommendation.py → map score to training recommendation
+#   sharding.py     → score multi-athlete tables across CPU cores
+#   state.py        → incremental per-athlete rolling state
+#   pipeline.py     → end-to-end data path and its cache key
+#   columnar.py     → memory-mapped columnar history store
+#   instrument.py   → opt-in per-stage timing and counters
+#   service.py      → headless CLI and HTTP JSON scoring endpoint
+#   records.py      → compact scored-day records
+#   ingest.py       → asyncio ingestion server for concurrent uploads
+#   calibration.py  → batched per-athlete weight calibration
+#   chart.py        → server-side trend chart downsampling
+#   table.py        → paged history table with server-side filter/sort
+#   dateindex.py    → date-indexed scored histories for point/range queries
+#   whatif.py       → vectorized what-if scenarios for planned days
+#   backfill.py     → resumable parallel rescoring of a columnar archive
+#   windows.py      → configurable mean, median/MAD and EWMA window features
+#   scorestore.py   → persistent results with incremental recomputation
+#   cohort.py       → mergeable cohort percentile / rank index
+#   kernel.py       → pandas-free NumPy core for features, scoring and tiers
+#   tail.py         → tail-only loading of recent history plus warm-up rows
@@ -0,0 +1,267 @@
+"""
+backfill.py — Rescore a whole columnar archive across CPU cores, resumably.
+
+Changing WEIGHTS, the feature windows or the TIERS thresholds means rescoring
+every athlete-day on record. backfill() does that from a columnar store
+(see columnar.py) without pickling any DataFrames:
+
+    - The archive is cut into tasks of about task_rows rows, at athlete
+      boundaries, so every athlete's history is scored in one piece.
+    - Each worker memory-maps the input store once, and also the output
+      columns, which are preallocated .npy files. A task reads its row
+      range as zero-copy arrays, runs compute_features → score_dataframe
+      → assign_tiers, and writes the results straight into the output
+      files in one slice assignment. Only a task's row range goes to the
+      worker, and only a few numbers come back.
+    - A finished task is appended to progress.log after its rows are
+      flushed. A rerun with the same archive (same path and contents) and
+      scoring configuration skips the logged tasks.
+    - Per-worker rows and busy time are collected into a rows/sec report.
+
+Output layout (a directory):
+    meta.json             → source store path and fingerprint, row count,
+                            scoring config, task edges
+    progress.log          → one finished task index per line
+    readiness_score.npy   → float64, NaN for unscored rows
+    contrib_*.npy         → float64 contribution columns
+    tier.npy              → int8 index into TIERS, -1 when unscored
+
+Run from the command line:
+    python -m sittingcc.backfill history.store scores.out --workers 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from sittingcc.columnar import HistoryStore, open_store
+from sittingcc.features import MAX_WINDOW
+from sittingcc.kernel import windows_version
+from sittingcc.recommendation import TIERS, assign_tiers
+from sittingcc.scoring import CONTRIBUTION_COLUMNS, weights_version
+from sittingcc.sharding import score_shard
+
+TASK_ROWS = 250_000
+
+# Output column → dtype
+OUTPUT_COLUMNS = {
+    "readiness_score": np.float64,
+    **{col: np.float64 for col in CONTRIBUTION_COLUMNS.values()},
+    "tier": np.int8,
+}
+
+
+def scoring_config() -> Dict:
+    """Everything that invalidates previous results when it changes."""
+    return {
+        "weights": weights_version(),
+        "windows": windows_version(),
+        "tiers": [tier["min"] for tier in TIERS],
+        "max_window": MAX_WINDOW,
+    }
+
+
+def store_fingerprint(store: HistoryStore) -> str:
+    """
+    Short hash of every column and the athlete index of a store. Reads the
+    whole archive once (about half a second per 10M rows), which a resumed
+    backfill pays to be sure it resumes against the same data.
+    """
+    digest = hashlib.sha1(json.dumps(store.athletes).encode())
+    arrays = [store.days, store.athlete_codes, *store.columns.values()]
+    for values in arrays:
+        if values is not None:
+            digest.update(np.ascontiguousarray(values).data)
+    return digest.hexdigest()[:16]
+
+
+def task_edges(store: HistoryStore, task_rows: int = TASK_ROWS) -> np.ndarray:
+    """Row offsets cutting the store into ~task_rows tasks at athlete boundaries."""
+    bounds = store.athlete_bounds()
+    targets = np.arange(task_rows, len(store), task_rows)
+    cuts = bounds[np.searchsorted(bounds, targets)]
+    return np.unique(np.concatenate(([0], cuts, [len(store)])))
+
+
+# ── Worker side ────────────────────────────────────────────────────────────────
+# Set once per worker process by _init_worker, then reused for every task
+_worker_store: Optional[HistoryStore] = None
+_worker_outputs: Dict[str, np.ndarray] = {}
+
+
+def _open_outputs(out_path: str, mode: str) -> Dict[str, np.ndarray]:
+    return {
+        col: np.load(os.path.join(out_path, f"{col}.npy"), mmap_mode=mode)
+        for col in OUTPUT_COLUMNS
+    }
+
+
+def _init_worker(store_path: str, out_path: str) -> None:
+    global _worker_store, _worker_outputs
+    _worker_store = open_store(store_path)
+    _worker_outputs = _open_outputs(out_path, "r+")
+
+
+def _run_task(task: int, start: int, end: int) -> Dict:
+    """Score rows [start, end) into the output files. Runs inside a worker."""
+    began = time.perf_counter()
+    scored = score_shard(_worker_store.to_dataframe(slice(start, end)))
+
+    scores = scored["readiness_score"].to_numpy(dtype=np.float64)
+    _worker_outputs["readiness_score"][start:end] = scores
+    for col in CONTRIBUTION_COLUMNS.values():
+        _worker_outputs[col][start:end] = scored[col].to_numpy(dtype=np.float64)
+    _worker_outputs["tier"][start:end] = assign_tiers(scores)
+    for values in _worker_outputs.values():
+        values.flush()
+
+    return {"task": task, "pid": os.getpid(), "rows": end - start, "seconds": time.perf_counter() - began}
+
+
+# ── Driver side ────────────────────────────────────────────────────────────────
+
+def _prepare_output(store: HistoryStore, store_path: str, out_path: str,
+                    task_rows: int, restart: bool) -> Tuple[np.ndarray, Set[int]]:
+    """Create or reopen the output directory. Returns task edges and finished tasks."""
+    meta_path = os.path.join(out_path, "meta.json")
+    log_path = os.path.join(out_path, "progress.log")
+
+    if os.path.exists(meta_path) and not restart:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        same_source = (
+            meta["source"] == os.path.abspath(store_path)
+            and meta["rows"] == len(store)
+            and meta.get("fingerprint") == store_fingerprint(store)
+        )
+        if not same_source or meta["config"] != scoring_config():
+            raise ValueError(
+                f"{out_path} holds a backfill of a different archive or scoring "
+                f"configuration; pass restart=True (--restart) to overwrite it"
+            )
+        done = set()
+        if os.path.exists(log_path):
+            with open(log_path) as f:
+                done = {int(line) for line in f if line.strip()}
+        return np.asarray(meta["task_edges"], dtype=np.int64), done
+
+    os.makedirs(out_path, exist_ok=True)
+    for path in (meta_path, log_path):
+        if os.path.exists(path):
+            os.remove(path)
+    for col, dtype in OUTPUT_COLUMNS.items():
+        np.lib.format.open_memmap(
+            os.path.join(out_path, f"{col}.npy"), mode="w+", dtype=dtype, shape=(len(store),)
+        ).flush()
+
+    edges = task_edges(store, task_rows)
+    meta = {
+        "source": os.path.abspath(store_path),
+        "rows": len(store),
+        "fingerprint": store_fingerprint(store),
+        "config": scoring_config(),
+        "task_edges": edges.tolist(),
+    }
+    # meta.json is written last: without it, the directory is treated as new
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    return edges, set()
+
+
+def backfill(
+    store_path: str,
+    out_path: str,
+    workers: Optional[int] = None,
+    task_rows: int = TASK_ROWS,
+    restart: bool = False,
+) -> Dict:
+    """
+    Rescore every row of a columnar store into out_path, resuming if possible.
+
+    Args:
+        store_path: columnar store written by convert_csv / write_store
+        out_path: output directory (created if needed)
+        workers: process count (default: os.cpu_count())
+        task_rows: target rows per task; only used when starting fresh
+        restart: discard existing progress in out_path
+
+    Returns a report: rows scored in this run, tasks skipped as already
+    done, wall seconds, overall rows/sec, and per-worker rows, busy seconds
+    and rows/sec.
+
+    Raises ValueError if out_path holds a backfill of a different store (path,
+    row count or contents) or scoring configuration and restart is False.
+    """
+    store = open_store(store_path)
+    edges, done = _prepare_output(store, store_path, out_path, task_rows, restart)
+    pending = [(task, int(edges[task]), int(edges[task + 1]))
+               for task in range(len(edges) - 1) if task not in done]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+    per_worker: Dict[int, Dict] = {}
+    began = time.perf_counter()
+
+    with open(os.path.join(out_path, "progress.log"), "a") as log, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(store_path, out_path)
+    ) as pool:
+        futures = [pool.submit(_run_task, *task) for task in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            log.write(f"{result['task']}\n")
+            log.flush()
+            stats = per_worker.setdefault(result["pid"], {"rows": 0, "seconds": 0.0, "tasks": 0})
+            stats["rows"] += result["rows"]
+            stats["seconds"] += result["seconds"]
+            stats["tasks"] += 1
+
+    elapsed = time.perf_counter() - began
+    rows = sum(stats["rows"] for stats in per_worker.values())
+    return {
+        "rows": rows,
+        "tasks": len(pending),
+        "tasks_skipped": len(done),
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "workers": [
+            {"pid": pid, **stats, "rows_per_sec": stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0}
+            for pid, stats in sorted(per_worker.items())
+        ],
+    }
+
+
+def open_results(out_path: str) -> Dict[str, np.ndarray]:
+    """Memory-map a finished backfill's output columns (read-only)."""
+    return _open_outputs(out_path, "r")
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rescore a columnar history archive.")
+    parser.add_argument("store", help="columnar store (python -m sittingcc.columnar)")
+    parser.add_argument("out", help="output directory")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--task-rows", type=int, default=TASK_ROWS)
+    parser.add_argument("--restart", action="store_true", help="discard existing progress")
+    args = parser.parse_args(argv)
+
+    try:
+        report = backfill(args.store, args.out, args.workers, args.task_rows, args.restart)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+
+    print(f"{report['rows']:,} rows in {report['seconds']:.2f}s "
+          f"({report['rows_per_sec']:,.0f} rows/s), "
+          f"{report['tasks']} tasks run, {report['tasks_skipped']} already done")
+    for worker in report["workers"]:
+        print(f"  worker {worker['pid']}: {worker['tasks']} tasks, {worker['rows']:,} rows, "
+              f"{worker['rows_per_sec']:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+calibration.py — Fit per-athlete scoring weights from labeled outcomes, all athletes at once.
+
+The formula stays the same — BASE_SCORE plus four weighted contributions — so
+calibrated scores remain explainable. Only the four weights become personal.
+
+Model (per athlete):
+    outcome - BASE_SCORE ≈ w · x,   x = [hrv_pct, rhr_delta, sleep_score - 75, strain_ratio - 1]
+
+Each athlete's weights solve a ridge problem shrunk toward the hand-tuned
+WEIGHTS rather than toward zero:
+
+    minimize  Σ (outcome - BASE_SCORE - w · x)²  +  l2 · Σ_j scale_j² (w_j - WEIGHTS_j)²
+
+scale_j is a typical magnitude of feature j (FEATURE_SCALES), so l2 reads as
+"the prior is worth about l2 days of data". An athlete with no labels keeps
+WEIGHTS exactly; one with years of labels is driven by their own data. With
+keep_signs (default) a weight that would flip sign against the prior is set to
+0 — a feature never counts backwards — which keeps explanations sensible.
+
+Batching:
+    The fit only needs per-athlete sufficient statistics (XᵀX, Xᵀr, n). update()
+    adds a batch of labeled rows to them with one bincount per matrix entry
+    over the whole table, and fit() solves every athlete's 4×4 system in one
+    stacked np.linalg.solve. New labels are just another update(), so refits
+    are incremental and exact — no history is re-read.
+
+Usage:
+    calibrator = WeightCalibrator()
+    calibrator.update(compute_features(labeled_df))   # needs athlete_id + outcome
+    calibrator.fit()
+    scored = score_dataframe(features, weights=calibrator.row_weights(features))
+"""
+
+from typing import Dict, Hashable, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.data import ATHLETE_COLUMN
+from sittingcc.scoring import BASE_SCORE, WEIGHTS
+
+# Column holding the observed outcome on the same 0–100 scale as the score
+LABEL_COLUMN = "outcome"
+
+# Weight keys in design-matrix column order
+WEIGHT_KEYS = ["hrv_pct", "rhr_delta", "sleep_score", "strain_ratio"]
+
+# Typical magnitude of each design-matrix column, used to scale the penalty
+FEATURE_SCALES = np.array([0.1, 2.0, 10.0, 0.3])
+
+
+def design_matrix(df: pd.DataFrame) -> np.ndarray:
+    """(rows × 4) matrix of the terms the weights multiply, in WEIGHT_KEYS order."""
+    return np.column_stack([
+        df["hrv_pct"].to_numpy(dtype=np.float64),
+        df["rhr_delta"].to_numpy(dtype=np.float64),
+        df["sleep_score"].to_numpy(dtype=np.float64) - 75,
+        df["strain_ratio"].to_numpy(dtype=np.float64) - 1.0,
+    ])
+
+
+class WeightCalibrator:
+    """
+    Per-athlete sufficient statistics and fitted weights.
+
+    Attributes:
+        athletes (list): athlete ids, in the row order of every array below
+        gram (ndarray): (athletes × 4 × 4) Σ x xᵀ
+        moment (ndarray): (athletes × 4) Σ x (outcome - BASE_SCORE)
+        counts (ndarray): labeled rows per athlete
+        weights (ndarray): (athletes × 4) fitted weights, WEIGHT_KEYS order
+    """
+
+    def __init__(self, l2: float = 30.0, keep_signs: bool = True, prior: Mapping[str, float] = None):
+        self.l2 = l2
+        self.keep_signs = keep_signs
+        self.prior = np.array([(prior or WEIGHTS)[key] for key in WEIGHT_KEYS], dtype=np.float64)
+        self.athletes: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+        self.gram = np.zeros((0, 4, 4))
+        self.moment = np.zeros((0, 4))
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.weights = np.zeros((0, 4))
+
+    def _register(self, athletes: List) -> None:
+        """Give every athlete not seen before a row of statistics."""
+        new = [a for a in athletes if a not in self._index]
+        if new:
+            for athlete in new:
+                self._index[athlete] = len(self.athletes)
+                self.athletes.append(athlete)
+            grow = len(new)
+            self.gram = np.concatenate([self.gram, np.zeros((grow, 4, 4))])
+            self.moment = np.concatenate([self.moment, np.zeros((grow, 4))])
+            self.counts = np.concatenate([self.counts, np.zeros(grow, dtype=np.int64)])
+            self.weights = np.concatenate([self.weights, np.tile(self.prior, (grow, 1))])
+
+    def _codes(self, ids: np.ndarray) -> np.ndarray:
+        """Map athlete ids to row indices, registering new athletes."""
+        uniques, inverse = np.unique(ids, return_inverse=True)
+        self._register(uniques.tolist())
+        lookup = np.array([self._index[a] for a in uniques.tolist()], dtype=np.intp)
+        return lookup[inverse]
+
+    def update(self, df: pd.DataFrame, label_col: str = LABEL_COLUMN, athlete=None) -> int:
+        """
+        Add labeled rows to the statistics. df is compute_features output with
+        a label column; rows missing a label or feature are ignored. Tables
+        without an athlete_id column are attributed to `athlete`.
+
+        Returns the number of rows used. Call fit() afterwards.
+        """
+        x = design_matrix(df)
+        target = df[label_col].to_numpy(dtype=np.float64) - BASE_SCORE
+        usable = np.isfinite(x).all(axis=1) & np.isfinite(target)
+        x, target = x[usable], target[usable]
+
+        if len(x) == 0:
+            return 0
+        if ATHLETE_COLUMN in df.columns:
+            codes = self._codes(df[ATHLETE_COLUMN].to_numpy()[usable])
+        else:
+            # One athlete: no ids to sort (np.unique cannot order None)
+            self._register([athlete])
+            codes = np.full(len(x), self._index[athlete], dtype=np.intp)
+        n = len(self.athletes)
+        for i in range(4):
+            self.moment[:, i] += np.bincount(codes, weights=x[:, i] * target, minlength=n)
+            for j in range(i, 4):
+                total = np.bincount(codes, weights=x[:, i] * x[:, j], minlength=n)
+                self.gram[:, i, j] += total
+                if i != j:
+                    self.gram[:, j, i] += total
+        self.counts += np.bincount(codes, minlength=n)
+        return len(x)
+
+    def fit(self) -> np.ndarray:
+        """Solve every athlete's regularized system at once. Returns self.weights."""
+        penalty = self.l2 * FEATURE_SCALES ** 2
+        lhs = self.gram + np.diag(penalty)
+        rhs = self.moment + penalty * self.prior
+        weights = np.linalg.solve(lhs, rhs[..., None])[..., 0]
+
+        if self.keep_signs:
+            weights = np.where(np.sign(weights) == -np.sign(self.prior), 0.0, weights)
+
+        self.weights = weights
+        return weights
+
+    def weights_for(self, athlete) -> Dict[str, float]:
+        """An athlete's weights as a WEIGHTS-shaped dict (the prior if unknown)."""
+        i = self._index.get(athlete)
+        values = self.prior if i is None else self.weights[i]
+        return {key: float(value) for key, value in zip(WEIGHT_KEYS, values)}
+
+    def row_weights(self, df: pd.DataFrame, athlete=None) -> Dict[str, np.ndarray]:
+        """
+        Per-row weight arrays for score_dataframe(df, weights=...). Rows of
+        athletes without a fit use the prior.
+        """
+        if ATHLETE_COLUMN not in df.columns:
+            return self.weights_for(athlete)
+
+        table = np.vstack([self.weights, self.prior])   # last row: unknown athlete
+        unknown = len(self.athletes)
+        codes = np.array(
+            [self._index.get(a, unknown) for a in df[ATHLETE_COLUMN].to_numpy().tolist()],
+            dtype=np.intp,
+        )
+        per_row = table[codes]
+        return {key: per_row[:, k] for k, key in enumerate(WEIGHT_KEYS)}
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable snapshot (statistics and fitted weights)."""
+        return {
+            "l2": self.l2,
+            "keep_signs": self.keep_signs,
+            "prior": self.prior.tolist(),
+            "athletes": list(self.athletes),
+            "gram": self.gram.tolist(),
+            "moment": self.moment.tolist(),
+            "counts": self.counts.tolist(),
+            "weights": self.weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "WeightCalibrator":
+        calibrator = cls(
+            l2=data["l2"],
+            keep_signs=data["keep_signs"],
+            prior=dict(zip(WEIGHT_KEYS, data["prior"])),
+        )
+        calibrator.athletes = list(data["athletes"])
+        calibrator._index = {a: i for i, a in enumerate(calibrator.athletes)}
+        calibrator.gram = np.array(data["gram"], dtype=np.float64).reshape(-1, 4, 4)
+        calibrator.moment = np.array(data["moment"], dtype=np.float64).reshape(-1, 4)
+        calibrator.counts = np.array(data["counts"], dtype=np.int64)
+        calibrator.weights = np.array(data["weights"], dtype=np.float64).reshape(-1, 4)
+        return calibrator
@@ -0,0 +1,154 @@
+"""
+chart.py — Trend chart data: visible range, calendar bucketing and downsampling.
+
+The trend chart used to ship every scored day to the browser. For multi-year
+histories that makes the payload and render time grow with history length.
+trend_data() bounds it:
+
+    1. Keep only the visible date range.
+    2. Pick a resolution from the range length: daily up to DAILY_MAX_DAYS,
+       weekly up to WEEKLY_MAX_DAYS, monthly beyond.
+    3. Represent each calendar bucket by actual days rather than a mean: the
+       day chosen by Largest-Triangle-Three-Buckets (LTTB) — the one forming
+       the largest triangle with the previous pick and the next bucket's
+       average, which follows the line's shape — plus the bucket's lowest
+       readiness / highest strain day, so dips and spikes are never dropped.
+    4. If there are more than max_points / 2 buckets, neighbouring buckets are
+       merged so no series exceeds max_points points.
+
+Readiness and strain are downsampled independently, so each keeps its own
+extremes. Rendering a 5-year history therefore costs about the same as 30 days.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+DAILY_MAX_DAYS = 120
+WEEKLY_MAX_DAYS = 730
+MAX_CHART_POINTS = 200
+
+# Series → display name in the chart legend
+SERIES = {
+    "readiness_score": "Readiness Score",
+    "strain_normalized": "Strain (normalized)",
+}
+
+# Series → which extreme of each bucket must survive downsampling
+KEEP_EXTREME = {
+    "readiness_score": "min",     # readiness dips
+    "strain_normalized": "max",   # strain spikes
+}
+
+
+def resolution_for(span_days: int) -> str:
+    """'daily', 'weekly' or 'monthly' for a visible range of span_days."""
+    if span_days <= DAILY_MAX_DAYS:
+        return "daily"
+    if span_days <= WEEKLY_MAX_DAYS:
+        return "weekly"
+    return "monthly"
+
+
+def _bucket_starts(dates: pd.Series, resolution: str, max_points: int) -> np.ndarray:
+    """Row offsets where each calendar bucket starts (dates sorted ascending)."""
+    if resolution == "daily":
+        periods = dates.dt.normalize().to_numpy()
+    else:
+        periods = dates.dt.to_period("W" if resolution == "weekly" else "M").to_numpy()
+    starts = np.flatnonzero(np.concatenate(([True], periods[1:] != periods[:-1])))
+
+    # Merge neighbouring buckets until the point budget (2 per bucket) is met
+    max_buckets = max(max_points // 2, 2)
+    if len(starts) > max_buckets:
+        keep = np.linspace(0, len(starts), max_buckets, endpoint=False).astype(int)
+        starts = starts[keep]
+    return starts
+
+
+def lttb(x: np.ndarray, y: np.ndarray, starts: np.ndarray, extreme: Optional[str] = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets over the given buckets.
+
+    Returns the selected row indices in time order: one LTTB pick per bucket,
+    plus each bucket's minimum or maximum y when extreme is 'min' or 'max'.
+    The first and last rows are always kept, so the line spans the full range.
+    """
+    n = len(x)
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    bounds = np.append(starts, n)
+    n_buckets = len(starts)
+
+    picks = [0, n - 1]
+    anchor = 0
+    for b in range(n_buckets):
+        lo, hi = bounds[b], bounds[b + 1]
+        if extreme == "min":
+            picks.append(lo + int(y[lo:hi].argmin()))
+        elif extreme == "max":
+            picks.append(lo + int(y[lo:hi].argmax()))
+        if b == 0 or b == n_buckets - 1:
+            continue   # first/last buckets are anchored by the end points
+
+        # Triangle apex: average of the next bucket (the last row for the final one)
+        next_lo, next_hi = (bounds[b + 1], bounds[b + 2]) if b + 2 < n_buckets else (n - 1, n)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        ax, ay = x[anchor], y[anchor]
+        area = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay))
+        anchor = lo + int(area.argmax())
+        picks.append(anchor)
+
+    return np.unique(picks)
+
+
+def trend_data(
+    df: pd.DataFrame,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+    max_points: int = MAX_CHART_POINTS,
+) -> pd.DataFrame:
+    """
+    Long-format (date, metric, value) chart data for the visible range.
+
+    df holds scored rows (date, readiness_score, strain), sorted by date.
+    Strain is normalized to 0–100 against its maximum over the visible range,
+    before downsampling. The result carries a 'resolution' attribute in
+    .attrs for labelling the chart.
+    """
+    visible = df
+    if start is not None:
+        visible = visible[visible["date"] >= start]
+    if end is not None:
+        visible = visible[visible["date"] <= end]
+
+    dates = pd.to_datetime(visible["date"]).reset_index(drop=True)
+    span_days = (dates.iloc[-1] - dates.iloc[0]).days + 1 if len(dates) else 0
+    resolution = resolution_for(span_days)
+
+    strain = visible["strain"].to_numpy(dtype=np.float64)
+    strain_max = strain.max() if len(strain) else 1.0
+    values = {
+        "readiness_score": visible["readiness_score"].to_numpy(dtype=np.float64),
+        # Normalize strain to 0–100 scale for visual comparison
+        "strain_normalized": np.round(strain / (strain_max or 1.0) * 100, 1),
+    }
+
+    frames: List[pd.DataFrame] = []
+    if len(dates):
+        starts = _bucket_starts(dates, resolution, max_points)
+        x = dates.to_numpy().astype("datetime64[s]").astype(np.float64)
+        for name, y in values.items():
+            rows = lttb(x, y, starts, KEEP_EXTREME[name])
+            frames.append(pd.DataFrame({
+                "date": dates.to_numpy()[rows],
+                "metric": SERIES[name],
+                "value": y[rows],
+            }))
+
+    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["date", "metric", "value"])
+    out.attrs["resolution"] = resolution
+    return out
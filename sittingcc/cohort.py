@@ -0,0 +1,255 @@
+"""
+cohort.py — Cohort percentile index: rank a score against a squad or age group.
+
+"Today's readiness is in the 15th percentile of your squad" used to mean
+collecting and sorting every cohort member's score per request. Readiness
+scores are sums of contributions rounded to 0.1 and clipped to 0–100, so a
+day's scores take one of only SCORE_BINS = 1001 values. A ScoreHistogram
+counts scores per 0.1 step, which makes it an exact quantile sketch:
+
+    - fixed size (1001 counts) however large the cohort
+    - add / remove a score in O(1), in bulk with one bincount
+    - merge two histograms (e.g. from different workers) by adding counts;
+      merged answers are exact, not approximations
+    - rank and percentile queries read a cached cumulative count in O(1),
+      and quantile queries binary-search it in O(log SCORE_BINS); the cache
+      is rebuilt (one 1001-element cumsum) after a change
+
+CohortIndex keeps one histogram per (cohort, day), fed from score_dataframe
+output. An athlete may belong to several cohorts. Days that are no longer
+queried can be pruned.
+"""
+
+from typing import Dict, Hashable, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.columnar import dates_to_days
+from sittingcc.data import ATHLETE_COLUMN
+
+SCORE_STEP = 0.1
+SCORE_BINS = 1001   # 0.0, 0.1, ..., 100.0
+
+
+def score_bins(scores) -> np.ndarray:
+    """Bin index (score / 0.1) of every non-NaN score."""
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    scores = scores[~np.isnan(scores)]
+    return np.clip(np.rint(scores / SCORE_STEP), 0, SCORE_BINS - 1).astype(np.intp)
+
+
+class ScoreHistogram:
+    """Exact counts of one cohort-day's scores, in 0.1 steps."""
+
+    __slots__ = ("counts", "_cumulative")
+
+    def __init__(self, counts: Optional[np.ndarray] = None):
+        self.counts = np.zeros(SCORE_BINS, dtype=np.int64) if counts is None else counts
+        self._cumulative: Optional[np.ndarray] = None
+
+    def _changed(self) -> None:
+        self._cumulative = None
+
+    def _cum(self) -> np.ndarray:
+        """cum[b] = number of scores in bins 0 .. b."""
+        if self._cumulative is None:
+            self._cumulative = np.cumsum(self.counts)
+        return self._cumulative
+
+    @property
+    def total(self) -> int:
+        return int(self._cum()[-1])
+
+    def add(self, scores) -> None:
+        """Count scores (NaN ignored)."""
+        self.counts += np.bincount(score_bins(scores), minlength=SCORE_BINS)
+        self._changed()
+
+    def remove(self, scores) -> None:
+        """Un-count previously added scores (e.g. before re-adding corrected ones)."""
+        removed = np.bincount(score_bins(scores), minlength=SCORE_BINS)
+        if (removed > self.counts).any():
+            raise ValueError("Cannot remove scores that were never added")
+        self.counts -= removed
+        self._changed()
+
+    def merge(self, other: "ScoreHistogram") -> None:
+        """Add another histogram's counts (e.g. the same cohort-day from another shard)."""
+        self.counts += other.counts
+        self._changed()
+
+    def rank(self, score: float) -> Tuple[int, int, int]:
+        """(scores below, scores equal, total) for score."""
+        b = int(score_bins([score])[0])
+        cum = self._cum()
+        below = int(cum[b - 1]) if b else 0
+        return below, int(cum[b]) - below, int(cum[-1])
+
+    def percentile(self, score: float) -> float:
+        """
+        Percentile rank of score, 0–100: the share of scores below it, counting
+        ties as half (so the median of an odd cohort is exactly 50).
+        NaN for an empty histogram.
+        """
+        below, equal, total = self.rank(score)
+        return 100.0 * (below + 0.5 * equal) / total if total else float("nan")
+
+    def quantile(self, q: float) -> float:
+        """
+        Smallest score with at least a fraction q of scores at or below it
+        (numpy's 'inverted_cdf' quantile). NaN for an empty histogram.
+        """
+        cum = self._cum()
+        if not cum[-1]:
+            return float("nan")
+        needed = max(1, int(np.ceil(q * cum[-1])))
+        return round(int(np.searchsorted(cum, needed)) * SCORE_STEP, 1)
+
+    def to_dict(self) -> Dict:
+        """Sparse JSON-serializable form: only non-empty bins."""
+        bins = np.flatnonzero(self.counts)
+        return {"bins": bins.tolist(), "counts": self.counts[bins].tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "ScoreHistogram":
+        counts = np.zeros(SCORE_BINS, dtype=np.int64)
+        counts[np.asarray(data["bins"], dtype=np.intp)] = data["counts"]
+        return cls(counts)
+
+
+Cohorts = Union[Mapping[Hashable, Union[Hashable, Iterable[Hashable]]], str]
+
+
+class CohortIndex:
+    """
+    Per-cohort, per-day score histograms.
+
+    Attributes:
+        histograms (dict): {(cohort, day number): ScoreHistogram}; day numbers
+            are days since 1970-01-01
+    """
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[Hashable, int], ScoreHistogram] = {}
+
+    def _histogram(self, cohort, date, create: bool = False) -> Optional[ScoreHistogram]:
+        key = (cohort, int(dates_to_days([pd.Timestamp(date)])[0]))
+        if create and key not in self.histograms:
+            self.histograms[key] = ScoreHistogram()
+        return self.histograms.get(key)
+
+    # ── Updates ───────────────────────────────────────────────────────────────
+
+    def add(self, cohort, date, scores) -> None:
+        """Count one cohort-day's new scores."""
+        self._histogram(cohort, date, create=True).add(scores)
+
+    def remove(self, cohort, date, scores) -> None:
+        """Un-count scores previously added for a cohort-day."""
+        histogram = self._histogram(cohort, date)
+        if histogram is None:
+            raise ValueError(f"No scores recorded for cohort {cohort!r} on {pd.Timestamp(date):%Y-%m-%d}")
+        histogram.remove(scores)
+
+    def add_scored(self, df: pd.DataFrame, cohorts: Cohorts) -> None:
+        """
+        Count every scored row of score_dataframe output.
+
+        cohorts is either the name of a column of df holding each row's cohort,
+        or a mapping from athlete_id to one cohort or a list of cohorts.
+        Athletes missing from the mapping, rows without a cohort and unscored
+        rows are skipped.
+        """
+        scores = df["readiness_score"].to_numpy(dtype=np.float64, na_value=np.nan)
+        scored = ~np.isnan(scores)
+        days = dates_to_days(df["date"])[scored]
+        bins = score_bins(scores[scored])
+
+        if isinstance(cohorts, str):
+            members = df[cohorts].to_numpy()[scored]
+            rows = np.arange(len(bins))
+        else:
+            athletes = df[ATHLETE_COLUMN].to_numpy()[scored]
+            members, rows = [], []
+            for row, athlete in enumerate(athletes):
+                groups = cohorts.get(athlete, ())
+                if isinstance(groups, (str, bytes)) or not isinstance(groups, Iterable):
+                    groups = (groups,)
+                for group in groups:
+                    members.append(group)
+                    rows.append(row)
+            members = np.array(members, dtype=object)
+            rows = np.asarray(rows, dtype=np.intp)
+        if not len(rows):
+            return
+
+        # One bincount per (cohort, day): group rows by a combined integer key.
+        # Rows without a cohort (code -1) are skipped, like unmapped athletes
+        codes, labels = pd.factorize(members)
+        rows = rows[codes >= 0]
+        codes = codes[codes >= 0]
+        if not len(rows):
+            return
+        key_days = days[rows]
+        first_day = key_days.min()
+        span = int(key_days.max() - first_day) + 1
+        keys = codes.astype(np.int64) * span + (key_days - first_day)
+        order = np.argsort(keys, kind="stable")
+        keys, key_bins = keys[order], bins[rows][order]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        for start, end in zip(starts, np.append(starts[1:], len(keys))):
+            cohort = labels[keys[start] // span]
+            day = int(first_day + keys[start] % span)
+            histogram = self.histograms.setdefault((cohort, day), ScoreHistogram())
+            histogram.counts += np.bincount(key_bins[start:end], minlength=SCORE_BINS)
+            histogram._changed()
+
+    def merge(self, other: "CohortIndex") -> None:
+        """Fold another index (e.g. from another worker) into this one."""
+        for key, histogram in other.histograms.items():
+            self.histograms.setdefault(key, ScoreHistogram()).merge(histogram)
+
+    def prune(self, before) -> int:
+        """Drop histograms for days before `before`. Returns how many were dropped."""
+        cutoff = int(dates_to_days([pd.Timestamp(before)])[0])
+        stale = [key for key in self.histograms if key[1] < cutoff]
+        for key in stale:
+            del self.histograms[key]
+        return len(stale)
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def percentile(self, cohort, date, score: float) -> float:
+        """Percentile rank (0–100) of score within the cohort's scores that day; NaN if none."""
+        histogram = self._histogram(cohort, date)
+        return histogram.percentile(score) if histogram is not None else float("nan")
+
+    def rank(self, cohort, date, score: float) -> Tuple[int, int]:
+        """(1-based rank with 1 = highest score, cohort size) for score that day."""
+        histogram = self._histogram(cohort, date)
+        if histogram is None:
+            return 1, 0
+        below, equal, total = histogram.rank(score)
+        return total - below - equal + 1, total
+
+    def quantile(self, cohort, date, q: float) -> float:
+        """Score at quantile q (0–1) of the cohort that day; NaN if none."""
+        histogram = self._histogram(cohort, date)
+        return histogram.quantile(q) if histogram is not None else float("nan")
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form, for shipping a worker's index to a merger."""
+        return {
+            "histograms": [
+                {"cohort": cohort, "day": day, **histogram.to_dict()}
+                for (cohort, day), histogram in self.histograms.items()
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "CohortIndex":
+        index = cls()
+        for entry in data["histograms"]:
+            index.histograms[(entry["cohort"], entry["day"])] = ScoreHistogram.from_dict(entry)
+        return index
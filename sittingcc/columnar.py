@@ -0,0 +1,167 @@
+"""
+columnar.py — Memory-mapped columnar history store, an alternative to CSV ingestion.
+
+load_data re-parses, sorts, coerces and validates a CSV on every call. A
+columnar store does that work once: convert_csv() writes the validated,
+sorted history as one typed binary column per file, and open_store() maps
+those files into memory without parsing or copying anything.
+
+Layout (a directory):
+    meta.json        → format version, row count, columns, athlete index
+    date.npy         → int64 days since 1970-01-01
+    hrv_ms.npy ...   → float64, one file per numeric column in REQUIRED_COLUMNS
+    athlete.npy      → int64 athlete codes (multi-athlete histories only)
+
+Convert once from the command line:
+    python -m sittingcc.columnar history.csv history.store
+
+Rows are stored in load_data order (by athlete, then date), and meta.json
+records where each athlete's rows start, so one athlete is a zero-copy slice.
+"""
+
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.data import ATHLETE_COLUMN, NUMERIC_COLUMNS, load_data
+
+FORMAT_VERSION = 1
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def dates_to_days(dates) -> np.ndarray:
+    """datetime-like values → int64 days since 1970-01-01."""
+    return (np.asarray(dates, dtype="datetime64[D]") - EPOCH).astype(np.int64)
+
+
+def days_to_dates(days: np.ndarray) -> np.ndarray:
+    """int64 days since 1970-01-01 → datetime64[ns] (the dtype load_data returns)."""
+    return (np.asarray(days).astype("datetime64[D]")).astype("datetime64[ns]")
+
+
+def write_store(df: pd.DataFrame, path: str) -> None:
+    """
+    Write a loaded history (output of load_data) to a columnar store at path.
+
+    The store is written to a temporary sibling directory and renamed into
+    place, so readers never see a half-written store.
+    """
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "rows": len(df),
+        "columns": NUMERIC_COLUMNS,
+        "athletes": None,
+        "athlete_starts": None,
+    }
+
+    np.save(os.path.join(tmp_path, "date.npy"), dates_to_days(df["date"]))
+    for col in NUMERIC_COLUMNS:
+        np.save(os.path.join(tmp_path, f"{col}.npy"), df[col].to_numpy(dtype=np.float64))
+
+    if ATHLETE_COLUMN in df.columns:
+        codes, athletes = pd.factorize(df[ATHLETE_COLUMN], sort=False)
+        np.save(os.path.join(tmp_path, "athlete.npy"), codes.astype(np.int64))
+        starts = np.flatnonzero(np.diff(codes)) + 1
+        meta["athletes"] = athletes.tolist()
+        meta["athlete_starts"] = [0] + starts.tolist() + [len(df)]
+
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp_path, path)
+
+
+def convert_csv(csv_path, store_path: str) -> None:
+    """One-time conversion: parse and validate a CSV with load_data, then store it."""
+    write_store(load_data(csv_path), store_path)
+
+
+class HistoryStore:
+    """
+    Read-only view of a columnar store. Columns are np.memmap arrays.
+
+    Attributes:
+        days (ndarray): int64 days since 1970-01-01, sorted within each athlete
+        columns (dict): {numeric column name: float64 ndarray}
+        athletes (list or None): athlete ids in storage order
+    """
+
+    def __init__(self, path: str):
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            raise ValueError(f"Not a columnar history store: {path}")
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported store version {meta.get('version')} in {path}")
+
+        self.path = path
+        self.rows = meta["rows"]
+        self.athletes: Optional[List] = meta["athletes"]
+        self._athlete_starts = meta["athlete_starts"]
+
+        def column(name: str) -> np.ndarray:
+            values = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            if len(values) != self.rows:
+                raise ValueError(f"Column '{name}' has {len(values)} rows, expected {self.rows}")
+            return values
+
+        self.days = column("date")
+        self.columns: Dict[str, np.ndarray] = {col: column(col) for col in meta["columns"]}
+        self.athlete_codes = column("athlete") if self.athletes is not None else None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def athlete_slice(self, athlete) -> slice:
+        """Row range holding one athlete's history. Raises KeyError if unknown."""
+        if self.athletes is None:
+            raise KeyError("Store has no athlete_id column")
+        try:
+            i = self.athletes.index(athlete)
+        except ValueError:
+            raise KeyError(f"Unknown athlete: {athlete!r}")
+        return slice(self._athlete_starts[i], self._athlete_starts[i + 1])
+
+    def athlete_bounds(self) -> np.ndarray:
+        """Row offsets where each athlete's block starts, plus the row count at the end."""
+        if self._athlete_starts is None:
+            return np.array([0, self.rows], dtype=np.int64)
+        return np.asarray(self._athlete_starts, dtype=np.int64)
+
+    def to_dataframe(self, rows: slice = slice(None)) -> pd.DataFrame:
+        """
+        Build a load_data-shaped DataFrame for a row range (default: all rows).
+
+        Numeric columns wrap the mapped arrays without copying; only the date
+        column is materialized (int64 days → datetime64[ns]).
+        """
+        data = {"date": days_to_dates(self.days[rows])}
+        if self.athlete_codes is not None:
+            data[ATHLETE_COLUMN] = np.asarray(self.athletes)[self.athlete_codes[rows]]
+        for col, values in self.columns.items():
+            data[col] = values[rows]
+        return pd.DataFrame(data, copy=False)
+
+
+def open_store(path: str) -> HistoryStore:
+    """Memory-map a store written by convert_csv / write_store."""
+    return HistoryStore(path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m sittingcc.columnar <input.csv> <output store dir>")
+    convert_csv(sys.argv[1], sys.argv[2])
+    print(f"Wrote {len(open_store(sys.argv[2])):,} rows to {sys.argv[2]}")
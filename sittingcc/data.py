@@ -3,37 +3,211 @@ data.py — Load and validate wearable/training CSV data.
 
 Expected columns:
     date, hrv_ms, rhr_bpm, sleep_hours, sleep_score, strain
+
+Optional columns:
+    athlete_id  → one long table covering many athletes; rows are grouped by
+                  athlete and sorted by date within each athlete
+
+Large exports:
+    iter_batches() streams a CSV in fixed-size chunks instead of loading it whole.
+    Each chunk is validated and coerced in one pass, dropped rows are counted
+    by reason, and peak memory stays at a few chunks regardless of file size.
 """
 
+import os
+from typing import Dict, Iterator, Optional
+
+import numpy as np
 import pandas as pd
 
+from sittingcc import instrument
+
 REQUIRED_COLUMNS = {"date", "hrv_ms", "rhr_bpm", "sleep_hours", "sleep_score", "strain"}
 
+NUMERIC_COLUMNS = ["hrv_ms", "rhr_bpm", "sleep_hours", "sleep_score", "strain"]
+
+# Present only in multi-athlete tables
+ATHLETE_COLUMN = "athlete_id"
+
+# Fixed date format for the streaming loader (no per-row format inference)
+DATE_FORMAT = "%Y-%m-%d"
 
+
+@instrument.instrumented
 def load_data(filepath: str) -> pd.DataFrame:
     """
     Load CSV from filepath, parse dates, sort chronologically,
     and validate required columns are present.
 
-    Returns a clean DataFrame indexed by integer, sorted by date.
+    Returns a clean DataFrame indexed by integer, sorted by date
+    (by athlete_id, then date, when an athlete_id column is present).
     Raises ValueError if required columns are missing.
+
+    filepath may also be a columnar store directory (see columnar.py), which is
+    already validated and sorted and is memory-mapped instead of parsed.
     """
+    if isinstance(filepath, (str, os.PathLike)) and os.path.isdir(filepath):
+        from sittingcc.columnar import open_store
+        return open_store(filepath).to_dataframe()
+
     df = pd.read_csv(filepath, parse_dates=["date"])
+    return prepare_data(df, source="CSV", copy=False)
 
+
+def prepare_data(df: pd.DataFrame, source: str = "Data", copy: bool = True) -> pd.DataFrame:
+    """
+    Validate, sort and type-enforce a raw table — the part of load_data that
+    does not depend on where the rows came from (CSV, JSON request body, ...).
+
+    copy=False transfers ownership of df: it may be modified and returned
+    instead of copied. With copy=True df is never modified, but the result
+    may share unchanged column data with it. Steps with nothing to do
+    (already sorted, already numeric, no null rows) are skipped, so a clean
+    table is never duplicated.
+
+    Raises ValueError if required columns are missing.
+    """
     # Validate schema
     missing = REQUIRED_COLUMNS - set(df.columns)
     if missing:
-        raise ValueError(f"CSV is missing required columns: {missing}")
+        raise ValueError(f"{source} is missing required columns: {missing}")
+
+    # `owned` turns True once df is a frame this function may modify: either
+    # handed over with copy=False or produced by one of the steps below
+    owned = not copy
+
+    if not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        if not owned:
+            df, owned = df.copy(), True
+        df["date"] = pd.to_datetime(df["date"])
 
     # Sort chronologically — rolling calculations depend on order
-    df = df.sort_values("date").reset_index(drop=True)
+    if not _is_sorted(df):
+        if ATHLETE_COLUMN in df.columns:
+            df = df.sort_values([ATHLETE_COLUMN, "date"], kind="stable")
+        else:
+            df = df.sort_values("date", kind="stable")
+        owned = True
 
     # Basic type enforcement
-    numeric_cols = ["hrv_ms", "rhr_bpm", "sleep_hours", "sleep_score", "strain"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in NUMERIC_COLUMNS:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            if not owned:
+                df, owned = df.copy(), True
+            df[col] = pd.to_numeric(df[col], errors="coerce")
 
     # Drop rows with any null values in required fields
-    df = df.dropna(subset=numeric_cols).reset_index(drop=True)
+    rows_read = len(df)
+    null_rows = df[NUMERIC_COLUMNS].isna().to_numpy().any(axis=1)
+    if null_rows.any():
+        df, owned = df[~null_rows], True
+    if not owned:
+        df = df.copy(deep=False)   # a distinct frame; column data is shared
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        df.index = pd.RangeIndex(len(df))
+    instrument.count("load_data.rows_read", rows_read)
+    instrument.count("load_data.rows_dropped", rows_read - len(df))
 
     return df
+
+
+def _is_sorted(df: pd.DataFrame) -> bool:
+    """True if df is already in prepare_data order (by athlete_id, then date)."""
+    dates = df["date"].to_numpy()
+    if ATHLETE_COLUMN not in df.columns:
+        return bool((dates[1:] >= dates[:-1]).all())
+    ids = df[ATHLETE_COLUMN].to_numpy()
+    try:
+        ids_ascending = ids[1:] >= ids[:-1]
+        same_athlete = ids[1:] == ids[:-1]
+    except TypeError:
+        return False   # mixed id types: let sort_values decide
+    return bool((ids_ascending & (~same_athlete | (dates[1:] >= dates[:-1]))).all())
+
+
+def _clean_batch(chunk: pd.DataFrame, date_format: str, report: Dict[str, int]) -> pd.DataFrame:
+    """
+    Coerce one raw chunk to load_data's types and drop invalid rows.
+
+    Numeric columns the C parser already read as float64 are used as-is; only a
+    column containing non-numeric text goes through to_numeric. Each dropped
+    row is counted once, under the first reason that applies.
+    """
+    dates = pd.to_datetime(chunk["date"], format=date_format, errors="coerce")
+    valid = dates.notna().to_numpy()
+    report["invalid date"] = report.get("invalid date", 0) + int((~valid).sum())
+
+    columns = {"date": dates}
+    for col in NUMERIC_COLUMNS:
+        values = chunk[col]
+        if values.dtype != np.float64:
+            values = pd.to_numeric(values, errors="coerce").astype(np.float64)
+        ok = values.notna().to_numpy()
+        reason = f"missing or non-numeric {col}"
+        report[reason] = report.get(reason, 0) + int((valid & ~ok).sum())
+        valid = valid & ok
+        columns[col] = values
+
+    df = pd.DataFrame(columns)
+    if ATHLETE_COLUMN in chunk.columns:
+        df.insert(0, ATHLETE_COLUMN, chunk[ATHLETE_COLUMN])
+    return df[valid]
+
+
+def iter_batches(
+    filepath,
+    batch_rows: int = 250_000,
+    date_format: str = DATE_FORMAT,
+    report: Optional[Dict[str, int]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV as clean, sorted batches of at most batch_rows rows.
+
+    Batches have the same columns and dtypes as load_data output and can be
+    fed straight to features.compute_features_stream. The file must already
+    be in date order (grouped by athlete_id for multi-athlete exports); rows
+    are sorted within each batch, but a batch that starts before the previous
+    one ended raises ValueError, since fixing that would need the whole file.
+
+    Args:
+        report: optional dict filled with counts — 'rows read', 'rows kept'
+                and one entry per drop reason
+
+    Raises ValueError if required columns are missing or input is unsorted.
+    """
+    report = {} if report is None else report
+    report.setdefault("rows read", 0)
+    report.setdefault("rows kept", 0)
+
+    header = pd.read_csv(filepath, nrows=0).columns
+    if hasattr(filepath, "seek"):
+        filepath.seek(0)
+    missing = REQUIRED_COLUMNS - set(header)
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {missing}")
+
+    multi = ATHLETE_COLUMN in header
+    usecols = [ATHLETE_COLUMN] * multi + ["date"] + NUMERIC_COLUMNS
+    sort_keys = [ATHLETE_COLUMN, "date"] if multi else ["date"]
+    last_key = None
+
+    chunks = pd.read_csv(
+        filepath, usecols=usecols, dtype={"date": str}, chunksize=batch_rows
+    )
+    for chunk in chunks:
+        report["rows read"] += len(chunk)
+        batch = _clean_batch(chunk, date_format, report)
+        if batch.empty:
+            continue
+
+        batch = batch.sort_values(sort_keys, kind="stable").reset_index(drop=True)
+        first_key = tuple(batch[sort_keys].iloc[0])
+        if last_key is not None and first_key < last_key:
+            raise ValueError(
+                f"CSV is not sorted: batch starting at {first_key} follows {last_key}. "
+                "Sort the export or use load_data."
+            )
+        last_key = tuple(batch[sort_keys].iloc[-1])
+
+        report["rows kept"] += len(batch)
+        yield batch
@@ -0,0 +1,248 @@
+"""
+dateindex.py — Date-indexed scored histories: O(1) point and range lookups.
+
+Looking up any day but the latest used to mean scanning a DataFrame. An
+AthleteDateIndex keeps one athlete's scored days in the packed
+SCORED_DAY_DTYPE layout from records.py, plus a calendar rank array:
+
+    rank[s] = number of stored days before calendar day first_day + s
+
+for every calendar day from the first stored day through the day after the
+last. With it:
+
+    lookup(date)       → one subtraction and two reads: O(1)
+    range(start, end)  → rank[start] : rank[end + 1] is the row slice, returned
+                         as a zero-copy ScoredHistory view: O(1 + k)
+    missing days       → calendar days where rank[s + 1] == rank[s]
+
+Missing calendar days (no upload) and unscored days (uploaded, but not enough
+history for a score) stay distinct. A missing day has no row: lookup()
+returns None, and calendar() marks it missing=True. An unscored day is a row
+with a NaN score and tier -1.
+
+append() takes the dict AthleteState.append returns, so an index fed from the
+incremental path stays current. Both arrays grow by doubling, so appends are
+amortized O(1). Re-appending the latest date replaces that day.
+
+DateIndex holds one AthleteDateIndex per athlete.
+"""
+
+from typing import Dict, Hashable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.columnar import dates_to_days, days_to_dates
+from sittingcc.data import ATHLETE_COLUMN
+from sittingcc.recommendation import assign_tiers
+from sittingcc.records import CONTRIBUTION_FIELDS, SCORED_DAY_DTYPE, ScoredDay, ScoredHistory
+from sittingcc.scoring import CONTRIBUTION_COLUMNS
+
+MIN_CAPACITY = 64
+
+
+def _to_day(date) -> int:
+    """Date-like value → int days since 1970-01-01."""
+    return int(dates_to_days([pd.Timestamp(date)])[0])
+
+
+def _grow(values: np.ndarray, needed: int) -> np.ndarray:
+    """values with capacity for at least `needed` entries (doubling)."""
+    if needed <= len(values):
+        return values
+    grown = np.empty(max(needed, 2 * len(values), MIN_CAPACITY), dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class AthleteDateIndex:
+    """
+    One athlete's scored days, indexed by calendar day.
+
+    Attributes:
+        first_day (int): days since 1970-01-01 of the earliest stored day
+        span (int): calendar days from first_day through the last stored day
+    """
+
+    __slots__ = ("_data", "_rank", "n", "first_day", "span")
+
+    def __init__(self):
+        self._data = np.empty(0, dtype=SCORED_DAY_DTYPE)
+        self._rank = np.zeros(1, dtype=np.int64)
+        self.n = 0
+        self.first_day = 0
+        self.span = 0
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "AthleteDateIndex":
+        """
+        Index score_dataframe output for one athlete (sorted by date).
+
+        Raises ValueError if dates are unsorted or repeated.
+        """
+        index = cls()
+        packed = ScoredHistory.from_dataframe(df).data
+        if len(packed) == 0:
+            return index
+
+        days = packed["day"].astype(np.int64)
+        if (np.diff(days) <= 0).any():
+            raise ValueError("Dates must be strictly increasing to build a date index")
+
+        index.first_day = int(days[0])
+        index.span = int(days[-1] - days[0]) + 1
+        counts = np.bincount(days - days[0], minlength=index.span)
+        index._rank = np.concatenate(([0], np.cumsum(counts)))
+        index._data = packed
+        index.n = len(packed)
+        return index
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def history(self) -> ScoredHistory:
+        """All stored days as a ScoredHistory view."""
+        return ScoredHistory(self._data[:self.n])
+
+    def _slot(self, date) -> int:
+        return _to_day(date) - self.first_day
+
+    # ── Appends ───────────────────────────────────────────────────────────────
+
+    def append(self, day: Mapping) -> None:
+        """
+        Add one scored day: a mapping with 'date', 'readiness_score' and a
+        'contributions' dict keyed by label (AthleteState.append output).
+
+        Days between the previous last day and this one become missing days.
+        Re-appending the last date replaces it; earlier dates raise ValueError.
+        """
+        d = _to_day(day["date"])
+        score = float(day["readiness_score"])
+        contributions = day.get("contributions") or {}
+
+        if self.n == 0:
+            self.first_day = d
+        last_day = self.first_day + self.span - 1
+        if self.n and d < last_day:
+            raise ValueError(
+                f"Day {pd.Timestamp(d, unit='D'):%Y-%m-%d} is earlier than last indexed day "
+                f"{pd.Timestamp(last_day, unit='D'):%Y-%m-%d}"
+            )
+
+        if self.n and d == last_day:
+            row = self.n - 1
+        else:
+            # Calendar slots up to d hold the current row count (gaps + d itself)
+            new_span = d - self.first_day + 1
+            self._rank = _grow(self._rank, new_span + 1)
+            self._rank[self.span:new_span] = self.n
+            self._rank[new_span] = self.n + 1
+            self.span = new_span
+            self._data = _grow(self._data, self.n + 1)
+            row = self.n
+            self.n += 1
+
+        record = self._data[row:row + 1]
+        record["day"] = d
+        record["score"] = score
+        record["tier"] = assign_tiers(np.array([score]))
+        for label, field in CONTRIBUTION_FIELDS.items():
+            record[field] = contributions.get(label, np.nan)
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def has_day(self, date) -> bool:
+        """True if the calendar day has a stored row (scored or not)."""
+        s = self._slot(date)
+        return 0 <= s < self.span and self._rank[s + 1] > self._rank[s]
+
+    def lookup(self, date) -> Optional[ScoredDay]:
+        """The stored day for date, or None if it is missing or out of range."""
+        s = self._slot(date)
+        if not (0 <= s < self.span) or self._rank[s + 1] == self._rank[s]:
+            return None
+        return self.history[int(self._rank[s])]
+
+    def _bounds(self, start, end):
+        """Clipped calendar slot range [lo, hi) for inclusive start/end dates."""
+        lo = 0 if start is None else max(self._slot(start), 0)
+        hi = self.span if end is None else min(self._slot(end) + 1, self.span)
+        return lo, max(hi, lo)
+
+    def range(self, start=None, end=None) -> ScoredHistory:
+        """Stored days with start <= date <= end (inclusive, None = open) as a view."""
+        lo, hi = self._bounds(start, end)
+        return ScoredHistory(self._data[self._rank[lo]:self._rank[hi]])
+
+    def missing_days(self, start=None, end=None) -> pd.DatetimeIndex:
+        """Calendar days in [start, end] within the indexed span that have no row."""
+        lo, hi = self._bounds(start, end)
+        slots = lo + np.flatnonzero(np.diff(self._rank[lo:hi + 1]) == 0)
+        return pd.DatetimeIndex(days_to_dates(self.first_day + slots))
+
+    def calendar(self, start=None, end=None) -> pd.DataFrame:
+        """
+        One row per calendar day in [start, end] within the indexed span.
+
+        Columns match ScoredHistory.to_dataframe plus 'missing'; missing days
+        have NaN score and contributions and tier -1.
+        """
+        lo, hi = self._bounds(start, end)
+        present = np.diff(self._rank[lo:hi + 1]) > 0
+        frame = self.range(start, end).to_dataframe()
+
+        n_days = hi - lo
+        df = pd.DataFrame({
+            "date": days_to_dates(self.first_day + np.arange(lo, hi)),
+            "readiness_score": np.full(n_days, np.nan),
+            "tier": np.full(n_days, -1, dtype=np.int64),
+        })
+        df.loc[present, "readiness_score"] = frame["readiness_score"].to_numpy()
+        df.loc[present, "tier"] = frame["tier"].to_numpy()
+        for col in CONTRIBUTION_COLUMNS.values():
+            df[col] = np.nan
+            df.loc[present, col] = frame[col].to_numpy()
+        df["missing"] = ~present
+        return df
+
+
+class DateIndex:
+    """Per-athlete date indexes for a scored (possibly multi-athlete) history."""
+
+    def __init__(self):
+        self.athletes: Dict[Hashable, AthleteDateIndex] = {}
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "DateIndex":
+        """
+        Index score_dataframe output. Single-athlete histories are stored
+        under the athlete id None.
+        """
+        index = cls()
+        if ATHLETE_COLUMN not in df.columns:
+            index.athletes[None] = AthleteDateIndex.from_dataframe(df)
+            return index
+        for athlete, rows in df.groupby(ATHLETE_COLUMN, sort=False).indices.items():
+            index.athletes[athlete] = AthleteDateIndex.from_dataframe(df.iloc[rows])
+        return index
+
+    def __getitem__(self, athlete) -> AthleteDateIndex:
+        """The athlete's index. Raises KeyError if unknown."""
+        try:
+            return self.athletes[athlete]
+        except KeyError:
+            raise KeyError(f"Unknown athlete: {athlete!r}")
+
+    def append(self, athlete, day: Mapping) -> None:
+        """Add a scored day for an athlete, creating their index on first use."""
+        self.athletes.setdefault(athlete, AthleteDateIndex()).append(day)
+
+    def lookup(self, athlete, date) -> Optional[ScoredDay]:
+        """The athlete's stored day for date, or None if missing / out of range."""
+        return self[athlete].lookup(date)
+
+    def range(self, athlete, start=None, end=None) -> ScoredHistory:
+        """The athlete's stored days with start <= date <= end."""
+        return self[athlete].range(start, end)
@@ -13,42 +13,102 @@ Design note:
     Ratios and deltas relative to personal baselines are more meaningful than raw values.
     An HRV of 55ms is great for one athlete and poor for another; deviation from your own
     norm is what actually predicts next-day readiness.
+
+Multi-athlete tables:
+    When an athlete_id column is present, every rolling window is computed per
+    athlete — a window never spans two athletes.
+
+Extra windows:
+    The baselines come from windows.DEFAULT_WINDOWS via window_features().
+    compute_features(df, windows=LOAD_WINDOWS) adds further simple / EWMA
+    windows (e.g. 14/42-day and acute/chronic load) in the same call. A spec
+    named after a baseline replaces it: compute_features(df,
+    windows=ROBUST_WINDOWS) uses 7-day medians for the HRV / RHR baselines,
+    so one glitched reading no longer skews hrv_pct for a week.
+
+Float32 mode:
+    compute_features(df, dtype="float32") stores the input and feature columns as
+    float32, halving their memory. Rolling means and ratios are still computed in
+    float64 and rounded once on output, so each feature carries at most one
+    float32 rounding (relative error ≤ 6e-8). Scoring in the same mode changes a
+    contribution only when it sits within ~1e-5 of a 0.05 rounding boundary,
+    and then by one 0.1 step, so a score can move by at most 0.4. On 1M
+    synthetic athlete-days about 0.1% of scores moved, by 0.1 or 0.2.
+
+Pandas-free use:
+    kernel.features() computes the same columns from plain arrays without
+    importing pandas; compute_features shares its derive_features step.
+
+Streaming:
+    compute_features_stream() consumes the sorted batches from data.iter_batches,
+    carrying the last MAX_WINDOW - 1 rows forward so windows span batch edges.
 """
 
+from typing import Iterable, Iterator, Mapping
+
+import numpy as np
 import pandas as pd
 
+from sittingcc import instrument
+from sittingcc.data import NUMERIC_COLUMNS
+from sittingcc.kernel import FEATURE_COLUMNS, derive_features
+from sittingcc.windows import DEFAULT_WINDOWS, window_features
+
+# Longest rolling window — rows of history needed before a row's features are final
+MAX_WINDOW = 28
+
 
-def compute_features(df: pd.DataFrame) -> pd.DataFrame:
+@instrument.instrumented
+def compute_features(
+    df: pd.DataFrame, dtype: str = "float64", windows: Mapping[str, Mapping] = None, copy: bool = True
+) -> pd.DataFrame:
     """
     Add rolling feature columns to the DataFrame.
     Requires at least 7 rows for meaningful HRV/RHR baselines.
     Rows with insufficient history will have NaN features (handled downstream).
+    Multi-athlete tables (athlete_id column) get per-athlete windows.
+    dtype="float32" stores inputs and features as float32 (see module docstring).
+    windows adds extra window specs (see windows.py) as columns of the same name.
+    copy=False transfers ownership: columns are added to df itself and df is returned.
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
 
     # 7-day rolling baselines (min_periods=3 to allow early rows to still score)
-    df["hrv_baseline_7d"] = (
-        df["hrv_ms"].rolling(window=7, min_periods=3).mean()
-    )
-    df["rhr_baseline_7d"] = (
-        df["rhr_bpm"].rolling(window=7, min_periods=3).mean()
-    )
-
-    # 28-day rolling strain average (chronic training load)
-    df["strain_avg_28d"] = (
-        df["strain"].rolling(window=28, min_periods=7).mean()
-    )
-
-    # HRV percent deviation from baseline
-    # Positive means HRV is above baseline (good), negative means suppressed (bad)
-    df["hrv_pct"] = (df["hrv_ms"] - df["hrv_baseline_7d"]) / df["hrv_baseline_7d"]
-
-    # RHR delta from baseline
-    # Positive means heart rate is elevated above normal (bad sign)
-    df["rhr_delta"] = df["rhr_bpm"] - df["rhr_baseline_7d"]
-
-    # Strain ratio: today's strain vs chronic average
-    # > 1.0 means training harder than usual; < 1.0 means backing off
-    df["strain_ratio"] = df["strain"] / df["strain_avg_28d"].replace(0, 1)
+    # and 28-day rolling strain average (chronic training load), plus any
+    # extra windows, all from one window_features() call
+    extra = dict(windows or {})
+    for name, values in window_features(df, {**DEFAULT_WINDOWS, **extra}).items():
+        df[name] = values
+
+    # HRV percent deviation, RHR delta and strain ratio vs those baselines
+    # (same expressions as the pandas-free kernel, so both paths agree)
+    derived = derive_features(*(
+        df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        for col in ("hrv_ms", "rhr_bpm", "strain", "hrv_baseline_7d", "rhr_baseline_7d", "strain_avg_28d")
+    ))
+    for name, values in derived.items():
+        df[name] = values
+
+    if np.dtype(dtype) != np.float64:
+        columns = NUMERIC_COLUMNS + FEATURE_COLUMNS + [name for name in extra if name not in FEATURE_COLUMNS]
+        df[columns] = df[columns].astype(dtype)
 
     return df
+
+
+def compute_features_stream(batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    compute_features over a stream of sorted batches (see data.iter_batches).
+
+    Each batch is featurized together with the previous MAX_WINDOW - 1 rows,
+    which are then dropped from the output, so every yielded row has the same
+    features as compute_features over the whole history (up to floating-point
+    rounding in the last digit).
+    """
+    warmup = None
+    for batch in batches:
+        n_warmup = 0 if warmup is None else len(warmup)
+        frame = batch if warmup is None else pd.concat([warmup, batch], ignore_index=True)
+        yield compute_features(frame).iloc[n_warmup:].reset_index(drop=True)
+        warmup = frame.iloc[-(MAX_WINDOW - 1):]
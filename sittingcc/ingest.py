@@ -0,0 +1,278 @@
+"""
+ingest.py — asyncio ingestion server for bursts of concurrent wearable uploads.
+
+Usage:
+    python -m sittingcc.ingest --port 8766 --workers 4 --queue 256
+
+Endpoint:
+    POST /upload/<athlete_id>
+        body: a CSV with the REQUIRED_COLUMNS schema (Content-Type: text/csv), or
+              JSON {"days": [{day}, ...]} (Content-Type: application/json)
+        ← 200 with the athlete's latest score (same shape as service.py results)
+        ← 400 on a malformed upload or one with no valid rows,
+          503 + Retry-After when the queue is full
+
+Design:
+    - The event loop only parses HTTP and moves bytes. CSV/JSON parsing,
+      prepare_data, compute_features and scoring run in a process pool via
+      run_in_executor, so the loop never blocks on pandas. Workers are spawned,
+      not forked: a forked worker would inherit open client sockets and keep
+      those connections from closing.
+    - Backpressure: accepted uploads wait in a bounded queue. When it is full
+      the server answers 503 immediately instead of buffering without limit.
+    - Coalescing: while an athlete's upload is still queued, further uploads
+      from that athlete join the same job. They are scored together once, and
+      every waiting request gets the result.
+
+Load test with benchmarks/loadgen.py.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+MAX_HEADER_BYTES = 16 * 1024
+# One athlete's upload; service.py's /score limit is larger because one
+# request there carries a whole squad
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+def _warm_worker() -> None:
+    """Import the scoring stack in a worker so the first upload doesn't pay for it."""
+    import sittingcc.features  # noqa: F401
+    import sittingcc.scoring  # noqa: F401
+    import sittingcc.service  # noqa: F401
+
+
+def score_uploads(athlete_id: str, uploads: List[Tuple[str, bytes]]) -> Dict:
+    """
+    Parse and score one athlete's coalesced uploads. Runs in a worker process.
+
+    uploads is a list of (content type, body). Later uploads win when two carry
+    the same date: prepare_data sorts stably, so rows stay in upload order
+    within a date. Raises ValueError on a malformed upload or when no row is
+    valid.
+    """
+    import pandas as pd
+
+    from sittingcc.data import prepare_data
+    from sittingcc.features import compute_features
+    from sittingcc.scoring import score_dataframe
+    from sittingcc.service import latest_results
+
+    frames = []
+    for content_type, body in uploads:
+        if content_type.startswith("application/json"):
+            payload = json.loads(body)
+            days = payload.get("days") if isinstance(payload, dict) else None
+            if not isinstance(days, list):
+                raise ValueError("JSON upload must be an object with a 'days' list")
+            frames.append(pd.DataFrame(days))
+        else:
+            frames.append(pd.read_csv(io.BytesIO(body)))
+
+    df = prepare_data(pd.concat(frames, ignore_index=True), source="Upload", copy=False)
+    if df.empty:
+        raise ValueError("Upload has no valid rows")
+    df = df.drop_duplicates(subset="date", keep="last").reset_index(drop=True)
+    result = latest_results(score_dataframe(compute_features(df, copy=False), copy=False))[0]
+    result["athlete_id"] = athlete_id
+    result["uploads_coalesced"] = len(uploads)
+    return result
+
+
+class _Job:
+    """Pending work for one athlete: uploads merged so far and their waiters."""
+
+    __slots__ = ("athlete_id", "uploads", "future")
+
+    def __init__(self, athlete_id: str, future: asyncio.Future):
+        self.athlete_id = athlete_id
+        self.uploads: List[Tuple[str, bytes]] = []
+        self.future = future
+
+
+class IngestServer:
+    """
+    Bounded-queue ingestion front end. Call start(), then serve_forever() or
+    use within an already-running loop; close() drains nothing and stops.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8766,
+        workers: Optional[int] = None,
+        queue_size: int = 256,
+        executor: Optional[Executor] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.pending: Dict[str, _Job] = {}
+        self.executor = executor or ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.stats = {"accepted": 0, "coalesced": 0, "rejected": 0, "scored": 0, "failed": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._dispatchers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _warm_worker) for _ in range(self.workers)
+        ))
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"Ingest server listening on http://{self.host}:{self.port}", flush=True)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        for task in self._dispatchers:
+            task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, athlete_id: str, content_type: str, body: bytes) -> Optional[asyncio.Future]:
+        """
+        Queue an upload, merging into the athlete's pending job if there is one.
+        Returns the job's future, or None when the queue is full.
+        """
+        job = self.pending.get(athlete_id)
+        if job is not None:
+            job.uploads.append((content_type, body))
+            self.stats["coalesced"] += 1
+            return job.future
+
+        job = _Job(athlete_id, asyncio.get_running_loop().create_future())
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            return None
+        job.uploads.append((content_type, body))
+        self.pending[athlete_id] = job
+        self.stats["accepted"] += 1
+        return job.future
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            # From here on, new uploads for this athlete start a fresh job
+            self.pending.pop(job.athlete_id, None)
+            try:
+                result = await loop.run_in_executor(
+                    self.executor, score_uploads, job.athlete_id, job.uploads
+                )
+                self.stats["scored"] += 1
+                job.future.set_result(result)
+            except Exception as e:
+                self.stats["failed"] += 1
+                job.future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, body = await self._respond(reader)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+
+        data = json.dumps(body).encode()
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(data)}",
+            "Connection: close",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> Tuple[int, Dict]:
+        head = await reader.readuntil(b"\r\n\r\n")
+        if len(head) > MAX_HEADER_BYTES:
+            return 400, {"error": "Headers too large"}
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        parts = request_line.split()
+        if len(parts) != 3:
+            return 400, {"error": "Malformed request line"}
+        method, path, _ = parts
+        headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "queued": self.queue.qsize(), **self.stats}
+        if not path.startswith("/upload/") or len(path) <= len("/upload/"):
+            return 404, {"error": f"Unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST to upload"}
+
+        header = headers.get("content-length") or "0"
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return 400, {"error": f"Invalid Content-Length: {header!r}"}
+        if length > MAX_BODY_BYTES:
+            return 413, {"error": f"Upload exceeds {MAX_BODY_BYTES} bytes"}
+        body = await reader.readexactly(length)
+
+        athlete_id = path[len("/upload/"):]
+        future = self.submit(athlete_id, headers.get("content-type", "text/csv"), body)
+        if future is None:
+            return 503, {"error": "Ingest queue is full, retry shortly"}
+        try:
+            return 200, await asyncio.shield(future)
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": str(e)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sitting CC upload ingestion server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--queue", type=int, default=256, help="max queued athlete jobs")
+    args = parser.parse_args()
+
+    server = IngestServer(args.host, args.port, args.workers, args.queue)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
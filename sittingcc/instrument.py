@@ -0,0 +1,188 @@
+"""
+instrument.py — Lightweight per-stage timing and counters for the pipeline.
+
+Disabled by default. While disabled, an @instrumented function costs a flag
+check and a thread-local lookup on top of the call, and count() returns
+immediately.
+
+When enabled, every instrumented call appends a stage record:
+    stage            → function name, e.g. "compute_features"
+    seconds          → wall time
+    rows_in          → len() of the first DataFrame argument (None otherwise)
+    rows_out         → len() of the returned DataFrame (None otherwise)
+    peak_bytes       → peak traced allocation above the stage's starting point
+                       (only with enable(track_memory=True), else None)
+
+and count(name, n) accumulates named counters such as rows dropped by
+load_data or rows left unscored by score_dataframe. snapshot() exports both as
+plain JSON-serializable data.
+
+Memory tracking uses tracemalloc, which slows allocation-heavy code noticeably;
+leave it off in production and turn it on when tuning.
+
+enable() is process-wide. A server handling several users at once (e.g. one
+Streamlit session per thread) should use `with recording() as recorded:`
+instead: it records only calls made by the current thread, into its own
+dict, and never starts tracemalloc.
+"""
+
+import contextlib
+import functools
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+MAX_RECORDS = 10_000
+
+_enabled = False
+_track_memory = False
+_records: deque = deque(maxlen=MAX_RECORDS)
+_counters: Dict[str, int] = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def enable(track_memory: bool = False) -> None:
+    """Start recording stages and counters (and allocation peaks, if asked)."""
+    global _enabled, _track_memory
+    _track_memory = track_memory
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording. Collected records are kept until clear()."""
+    global _enabled, _track_memory
+    _enabled = False
+    if _track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _track_memory = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def clear() -> None:
+    with _lock:
+        _records.clear()
+        _counters.clear()
+
+
+def _collector() -> Optional[Dict]:
+    """The current thread's recording() dict, if any."""
+    return getattr(_local, "collector", None)
+
+
+@contextlib.contextmanager
+def recording() -> Iterator[Dict]:
+    """
+    Record stages and counters from calls made by this thread only, into the
+    yielded {'stages': [...], 'counters': {...}} dict. Other threads and the
+    process-wide state are unaffected. Allocation peaks are recorded only if
+    enable(track_memory=True) is also on.
+    """
+    collector: Dict = {"stages": [], "counters": {}}
+    previous = _collector()
+    _local.collector = collector
+    try:
+        yield collector
+    finally:
+        _local.collector = previous
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add n to a named counter (no-op while disabled)."""
+    collector = _collector()
+    if not _enabled and collector is None:
+        return
+    n = int(n)
+    if collector is not None:
+        collector["counters"][name] = collector["counters"].get(name, 0) + n
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def records() -> List[Dict]:
+    """Stage records, oldest first (at most MAX_RECORDS are kept)."""
+    with _lock:
+        return list(_records)
+
+
+def counters() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def snapshot() -> Dict:
+    """All collected data as {'stages': [...], 'counters': {...}}."""
+    return {"stages": records(), "counters": counters()}
+
+
+def _rows(value):
+    # Duck-typed DataFrame check, so importing this module never pulls in pandas
+    return len(value) if hasattr(value, "columns") and hasattr(value, "__len__") else None
+
+
+def _memory_stack() -> List[Dict]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _flush_peak(stack: List[Dict]) -> None:
+    """Fold the current tracemalloc peak into every open stage, then reset it."""
+    current, peak = tracemalloc.get_traced_memory()
+    for frame in stack:
+        frame["peak"] = max(frame["peak"], peak)
+    tracemalloc.reset_peak()
+
+
+def instrumented(fn: Callable) -> Callable:
+    """Decorator: record a stage for each call of fn while instrumentation is on."""
+    stage = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        collector = _collector()
+        if not _enabled and collector is None:
+            return fn(*args, **kwargs)
+
+        rows_in = _rows(args[0]) if args else None
+        track = _track_memory and tracemalloc.is_tracing()
+        if track:
+            stack = _memory_stack()
+            _flush_peak(stack)
+            frame = {"start": tracemalloc.get_traced_memory()[0], "peak": 0}
+            stack.append(frame)
+
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = None
+            if track:
+                _flush_peak(stack)
+                stack.pop()
+                peak_bytes = max(frame["peak"] - frame["start"], 0)
+
+        record = {
+            "stage": stage,
+            "seconds": seconds,
+            "rows_in": rows_in,
+            "rows_out": _rows(result),
+            "peak_bytes": peak_bytes,
+        }
+        if collector is not None:
+            collector["stages"].append(record)
+        if _enabled:
+            with _lock:
+                _records.append(record)
+        return result
+
+    return wrapper
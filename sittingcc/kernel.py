@@ -0,0 +1,393 @@
+"""
+kernel.py — Pandas-free core: rolling features → score → tier on plain arrays.
+
+Turning a few arrays into a score used to mean importing pandas (through
+every sittingcc module) and, per row, compute_score's pd.Series lookups.
+This module is the shared core and imports only NumPy and the standard
+library:
+
+    rolling_mean      → trailing mean with pandas' rolling().mean() arithmetic
+    derive_features   → hrv_pct / rhr_delta / strain_ratio from baselines
+    features          → all FEATURE_COLUMNS from raw hrv / rhr / strain arrays
+    score_arrays      → vectorized scoring formula (see scoring.py)
+    score_row         → the same formula for one day, on plain floats
+    assign_tiers      → index into TIERS for every score
+    score_history     → features → score → tier in one call
+
+Inputs may be NumPy arrays, lists or any buffer (e.g. array.array("d")); they
+are read as float64 without copying where possible.
+
+The pandas API is a thin layer over this one: compute_features takes its
+derived columns from derive_features, compute_score / score_columns call
+score_row / score_arrays, and recommendation.py re-exports TIERS and
+assign_tiers. Results are bit-identical either way. The exception is bulk
+rolling means: compute_features gets them from pandas' compiled kernel, and
+rolling_mean replays the same Kahan-compensated add/remove steps in a Python
+loop (RollingMean, about 1 µs per row). So features() suits short or recent
+histories, e.g. the last MAX_WINDOW days before today, and large tables
+belong in compute_features.
+"""
+
+import hashlib
+import json
+import math
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from sittingcc import instrument
+
+# ── Scoring parameters (documented in scoring.py) ─────────────────────────────
+
+BASE_SCORE = 70.0
+
+# Contribution weights — see scoring.py's module docstring for rationale
+WEIGHTS = {
+    "hrv_pct":     120.0,
+    "rhr_delta":   -4.0,
+    "sleep_score": 0.25,   # applied as 0.25 * (sleep_score - 75)
+    "strain_ratio": -15.0, # applied as -15 * (strain_ratio - 1.0)
+}
+
+# Contribution label → column name used by the batch scoring path
+CONTRIBUTION_COLUMNS = {
+    "HRV vs Baseline":        "contrib_hrv",
+    "Resting HR vs Baseline": "contrib_rhr",
+    "Sleep Quality":          "contrib_sleep",
+    "Training Load":          "contrib_strain",
+}
+
+# Recommendation tiers with label and suggested workouts (see recommendation.py)
+TIERS = [
+    {
+        "min": 80,
+        "label": "High Intensity / Long Aerobic",
+        "detail": "Your body is primed. Today is the day for intervals, a race-pace effort, or your long session.",
+        "color": "#2ecc71",
+        "emoji": "🟢"
+    },
+    {
+        "min": 50,
+        "label": "Tempo / Aerobic Base",
+        "detail": "Solid readiness. Stick to controlled, aerobic efforts — tempo runs, zone 2 rides, steady swims.",
+        "color": "#f39c12",
+        "emoji": "🟡"
+    },
+    {
+        "min": 0,
+        "label": "Recovery / Rest",
+        "detail": "Your body is signaling stress. Prioritize an easy spin, yoga, or full rest today.",
+        "color": "#e74c3c",
+        "emoji": "🔴"
+    },
+]
+
+# ── Features ──────────────────────────────────────────────────────────────────
+
+# compute_features' rolling baselines (windows.py spec format)
+DEFAULT_WINDOWS = {
+    "hrv_baseline_7d": {"column": "hrv_ms", "kind": "mean", "window": 7, "min_periods": 3},
+    "rhr_baseline_7d": {"column": "rhr_bpm", "kind": "mean", "window": 7, "min_periods": 3},
+    "strain_avg_28d": {"column": "strain", "kind": "mean", "window": 28, "min_periods": 7},
+}
+
+FEATURE_COLUMNS = [
+    "hrv_baseline_7d", "rhr_baseline_7d", "strain_avg_28d",
+    "hrv_pct", "rhr_delta", "strain_ratio",
+]
+
+
+class RollingMean:
+    """
+    Fixed-window running mean over a ring buffer, matching pandas rolling().mean().
+
+    push() adds one value (evicting the oldest once the window is full) and
+    returns the current mean, or NaN while fewer than min_periods non-NaN
+    values are held. As in pandas, NaN values take up a slot in the window
+    but are left out of the sum and the count.
+    """
+
+    __slots__ = (
+        "window", "min_periods", "buffer", "head", "filled", "nobs", "sum_x",
+        "comp_add", "comp_remove", "neg_ct", "same_count", "prev_value",
+    )
+
+    def __init__(self, window: int, min_periods: int):
+        self.window = window
+        self.min_periods = min_periods
+        self.buffer = [0.0] * window
+        self.head = 0            # next slot to write; oldest value once full
+        self.filled = 0          # values held, NaN included
+        self.nobs = 0            # non-NaN values held
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_ct = 0
+        self.same_count = 0      # run length of identical trailing values
+        self.prev_value = math.nan
+
+    def push(self, value: float) -> float:
+        value = float(value)
+
+        # Evict the value leaving the window (Kahan-compensated subtraction)
+        if self.filled == self.window:
+            old = self.buffer[self.head]
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.comp_remove
+                t = self.sum_x + y
+                self.comp_remove = t - self.sum_x - y
+                self.sum_x = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+        else:
+            self.filled += 1
+
+        # Add the new value (Kahan-compensated addition)
+        self.buffer[self.head] = value
+        self.head = (self.head + 1) % self.window
+        if value == value:
+            self.nobs += 1
+            y = value - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct += 1
+            self.same_count = self.same_count + 1 if value == self.prev_value else 1
+            self.prev_value = value
+
+        return self.mean()
+
+    def mean(self) -> float:
+        if self.nobs < self.min_periods or self.nobs == 0:
+            return math.nan
+        # Same special cases as pandas: constant windows return the value
+        # exactly, and sign-consistent windows never flip sign from rounding
+        if self.same_count >= self.nobs:
+            return self.prev_value
+        result = self.sum_x / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "RollingMean":
+        rolling = cls(data["window"], data["min_periods"])
+        # States saved before 'filled' existed never held NaN
+        data = {"filled": data["nobs"], **data}
+        for name in cls.__slots__:
+            value = data[name]
+            setattr(rolling, name, list(value) if name == "buffer" else value)
+        return rolling
+
+
+def block_starts(ids) -> np.ndarray:
+    """For every row, the offset of the first row of its contiguous run of equal ids."""
+    ids = np.asarray(ids)
+    n = len(ids)
+    firsts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1]))) if n else np.empty(0, np.int64)
+    return np.repeat(firsts, np.diff(np.append(firsts, n))).astype(np.int64)
+
+
+def _float_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def rolling_mean(values, window: int, min_periods: int, athletes=None) -> np.ndarray:
+    """
+    Trailing mean over `window` rows, bit-identical to pandas rolling().mean().
+
+    athletes (optional) holds one id per row, with each athlete's rows
+    contiguous; windows then restart at every athlete's first row.
+    """
+    x = _float_array(values)
+    out = np.empty(len(x))
+    starts = np.zeros(1, np.int64) if athletes is None else np.unique(block_starts(athletes))
+    for start, end in zip(starts.tolist(), np.append(starts[1:], len(x)).tolist()):
+        rolling = RollingMean(window, min_periods)
+        out[start:end] = [rolling.push(value) for value in x[start:end].tolist()]
+    return out
+
+
+def derive_features(hrv_ms, rhr_bpm, strain, hrv_baseline, rhr_baseline, strain_avg) -> Dict[str, np.ndarray]:
+    """hrv_pct, rhr_delta and strain_ratio from raw values and their baselines."""
+    hrv_ms, hrv_baseline = _float_array(hrv_ms), _float_array(hrv_baseline)
+    strain_avg = _float_array(strain_avg)
+    return {
+        # Positive means HRV is above baseline (good), negative means suppressed (bad)
+        "hrv_pct": (hrv_ms - hrv_baseline) / hrv_baseline,
+        # Positive means heart rate is elevated above normal (bad sign)
+        "rhr_delta": _float_array(rhr_bpm) - _float_array(rhr_baseline),
+        # > 1.0 means training harder than usual; a zero average counts as 1
+        "strain_ratio": _float_array(strain) / np.where(strain_avg == 0, 1.0, strain_avg),
+    }
+
+
+def features(hrv_ms, rhr_bpm, strain, athletes=None) -> Dict[str, np.ndarray]:
+    """
+    FEATURE_COLUMNS from date-sorted raw arrays, as compute_features computes them.
+
+    athletes is as for rolling_mean. Returns {feature name: float64 array}.
+    """
+    columns = {"hrv_ms": hrv_ms, "rhr_bpm": rhr_bpm, "strain": strain}
+    out = {
+        name: rolling_mean(columns[spec["column"]], spec["window"], spec["min_periods"], athletes)
+        for name, spec in DEFAULT_WINDOWS.items()
+    }
+    out.update(derive_features(
+        hrv_ms, rhr_bpm, strain, out["hrv_baseline_7d"], out["rhr_baseline_7d"], out["strain_avg_28d"]
+    ))
+    return out
+
+
+# ── Scoring ───────────────────────────────────────────────────────────────────
+
+def weights_version(weights: Dict[str, float] = None) -> str:
+    """
+    Short fingerprint of BASE_SCORE and WEIGHTS (or the given weights).
+
+    Cached results keyed by this value are invalidated whenever the scoring
+    formula's parameters change.
+    """
+    weights = WEIGHTS if weights is None else weights
+    payload = json.dumps({"base": BASE_SCORE, "weights": weights}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def windows_version() -> str:
+    """Short fingerprint of DEFAULT_WINDOWS; stored features depend on it."""
+    payload = json.dumps(DEFAULT_WINDOWS, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def _round1(x: float) -> float:
+    """np.round(x, 1) on a plain float: rint(x * 10) / 10, keeping the sign of zero."""
+    y = x * 10.0
+    if not math.isfinite(y):
+        return y
+    return math.copysign(round(y) / 10.0, y)
+
+
+def score_row(
+    hrv_pct: float,
+    rhr_delta: float,
+    sleep_score: float = 75.0,
+    strain_ratio: float = 1.0,
+    weights: Dict[str, float] = None,
+) -> Tuple[float, Dict[str, float]]:
+    """
+    Score one day from plain floats; same result as score_arrays on that row.
+
+    Returns:
+        score (float): clamped readiness score 0–100 (NaN if hrv_pct or
+            rhr_delta is NaN)
+        contributions (dict): {contribution label: value rounded to 0.1}
+    """
+    w = WEIGHTS if weights is None else weights
+    contributions = {
+        "HRV vs Baseline": _round1(w["hrv_pct"] * float(hrv_pct)),
+        "Resting HR vs Baseline": _round1(w["rhr_delta"] * float(rhr_delta)),
+        "Sleep Quality": _round1(w["sleep_score"] * (float(sleep_score) - 75)),
+        "Training Load": _round1(w["strain_ratio"] * (float(strain_ratio) - 1.0)),
+    }
+    raw_score = BASE_SCORE + sum(contributions.values())
+    # max/min return raw_score itself when it is NaN
+    return min(max(raw_score, 0.0), 100.0), contributions
+
+
+def score_arrays(
+    hrv_pct: np.ndarray,
+    rhr_delta: np.ndarray,
+    sleep_score: np.ndarray,
+    strain_ratio: np.ndarray,
+    weights: Dict[str, np.ndarray] = None,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Vectorized compute_score over equal-length feature arrays.
+
+    weights overrides WEIGHTS; each value may be a scalar or a per-row array
+    (e.g. calibrated per-athlete weights broadcast to rows).
+
+    Rows where hrv_pct or rhr_delta is NaN are skipped, as in score_dataframe:
+    their score and every contribution are NaN.
+
+    Returns:
+        scores (ndarray): clamped readiness scores 0–100 (NaN for skipped rows)
+        contributions (dict): {contribution label: ndarray of contributions}
+    """
+    hrv_pct = _float_array(hrv_pct)
+    rhr_delta = _float_array(rhr_delta)
+    sleep_score = _float_array(sleep_score)
+    strain_ratio = _float_array(strain_ratio)
+
+    skip = np.isnan(hrv_pct) | np.isnan(rhr_delta)
+    if instrument.is_enabled():
+        instrument.count("score.skipped_nan_hrv_pct", np.isnan(hrv_pct).sum())
+        instrument.count("score.skipped_nan_rhr_delta", np.isnan(rhr_delta).sum())
+
+    # Each contribution is rounded to 0.1 before summing, as score_row does
+    w = WEIGHTS if weights is None else weights
+    contributions = {
+        "HRV vs Baseline": np.round(w["hrv_pct"] * hrv_pct, 1),
+        "Resting HR vs Baseline": np.round(w["rhr_delta"] * rhr_delta, 1),
+        "Sleep Quality": np.round(w["sleep_score"] * (sleep_score - 75), 1),
+        "Training Load": np.round(w["strain_ratio"] * (strain_ratio - 1.0), 1),
+    }
+    for values in contributions.values():
+        values[skip] = np.nan
+
+    # Same summation order as score_row: base + (hrv + rhr + sleep + strain)
+    total = (
+        contributions["HRV vs Baseline"]
+        + contributions["Resting HR vs Baseline"]
+        + contributions["Sleep Quality"]
+        + contributions["Training Load"]
+    )
+    scores = np.clip(BASE_SCORE + total, 0, 100)
+
+    return scores, contributions
+
+
+def assign_tiers(scores: np.ndarray) -> np.ndarray:
+    """
+    Vectorized get_recommendation: index into TIERS for every score.
+
+    Scores below every threshold fall back to the last tier, as in
+    get_recommendation. NaN scores (unscored rows) get -1.
+    """
+    scores = _float_array(scores)
+    # TIERS is ordered by descending threshold; searchsorted needs ascending
+    thresholds = np.array([tier["min"] for tier in TIERS][::-1], dtype=np.float64)
+    ascending = np.searchsorted(thresholds, scores, side="right") - 1
+    tiers = len(TIERS) - 1 - np.maximum(ascending, 0)
+    tiers[np.isnan(scores)] = -1
+    return tiers
+
+
+def score_history(
+    hrv_ms, rhr_bpm, sleep_score, strain, athletes=None, weights: Optional[Dict] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Features, scores and tiers for date-sorted raw arrays, without pandas.
+
+    Same values as compute_features → score_dataframe → assign_tiers. athletes
+    is as for rolling_mean; weights is passed to score_arrays.
+
+    Returns {feature name: array, 'readiness_score': array, 'tier': array
+    (-1 when unscored), contribution column (CONTRIBUTION_COLUMNS): array}.
+    """
+    out = features(hrv_ms, rhr_bpm, strain, athletes)
+    scores, contributions = score_arrays(
+        out["hrv_pct"], out["rhr_delta"], sleep_score, out["strain_ratio"], weights
+    )
+    out["readiness_score"] = scores
+    out["tier"] = assign_tiers(scores)
+    for label, col in CONTRIBUTION_COLUMNS.items():
+        out[col] = contributions[label]
+    return out
@@ -0,0 +1,103 @@
+"""
+pipeline.py — End-to-end data path shared by the app and other entry points.
+
+    load_data → compute_features → score_dataframe → recommendation labels
+
+Each stage takes ownership of the frame the previous stage returned (copy=False)
+and appends its columns to it, so peak memory is about the loaded input plus
+the derived columns rather than one full copy per stage.
+
+run_pipeline_tail() runs the same stages on just the last N days of a history
+(see tail.py), so the time to today's score does not grow with history length.
+
+Results depend only on the input bytes and the scoring parameters, so
+pipeline_key() combines a content hash with scoring.weights_version() to give
+callers a cache key that changes exactly when the output would.
+"""
+
+import hashlib
+import io
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from sittingcc import instrument
+from sittingcc.columnar import open_store
+from sittingcc.data import load_data
+from sittingcc.features import compute_features
+from sittingcc.recommendation import recommendation_labels
+from sittingcc.scoring import score_dataframe, weights_version
+from sittingcc.tail import read_tail, store_tail
+
+
+def pipeline_key(data: bytes) -> str:
+    """Cache key for running the pipeline on raw CSV bytes."""
+    return f"{hashlib.sha256(data).hexdigest()}:{weights_version()}"
+
+
+@instrument.instrumented
+def run_pipeline(source, dtype: str = "float64") -> pd.DataFrame:
+    """
+    Load, featurize and score a CSV (path, file-like object or raw bytes).
+    dtype="float32" runs features and scoring in float32 storage mode.
+
+    Returns the scored DataFrame with a 'recommendation' column holding the
+    tier label for scored rows (NaN for rows without enough history).
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    return _score_loaded(load_data(source), dtype)
+
+
+def _score_loaded(df: pd.DataFrame, dtype: str, warmup: int = 0) -> pd.DataFrame:
+    """compute_features → score_dataframe → labels on a loaded frame, minus `warmup` leading rows."""
+    # Each stage owns the frame the previous one returned, so every stage
+    # appends its columns to one shared frame instead of cloning it
+    df = compute_features(df, dtype=dtype, copy=False)
+    df = score_dataframe(df, dtype=dtype, copy=False)
+    if warmup:
+        df = df.iloc[warmup:].reset_index(drop=True)
+    df["recommendation"] = recommendation_labels(df["readiness_score"].to_numpy(dtype=np.float64, na_value=np.nan))
+    return df
+
+
+@instrument.instrumented
+def run_pipeline_tail(source, days: Optional[int], dtype: str = "float64") -> pd.DataFrame:
+    """
+    run_pipeline restricted to the last `days` days of a history (None: all).
+
+    source is as for run_pipeline, or a single-athlete columnar store
+    directory. Only the tail of the file is read (see tail.py); when that is
+    not possible (multi-athlete or unsorted files, or a first row whose date
+    does not parse) the whole source is scored.
+
+    Returns the scored rows of at least the last `days` days, with
+    df.attrs["complete_history"] (True when every row of the source is
+    included) and df.attrs["history_start"] ('YYYY-MM-DD' of the source's
+    first row, None when it has no rows).
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    tail = None
+    if days is not None:
+        if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+            store = open_store(source)
+            if store.athletes is None or len(store.athletes) == 1:
+                tail = store_tail(store, days)
+        else:
+            tail = read_tail(source, days)
+
+    if tail is None:
+        df = run_pipeline(source, dtype=dtype)
+        complete, first_date = True, df["date"].iloc[0] if len(df) else pd.NaT
+    else:
+        df = _score_loaded(tail.df, dtype, tail.warmup)
+        complete, first_date = tail.complete, tail.first_date
+    # attrs travel with derived frames, so they are kept JSON-serializable
+    df.attrs["complete_history"] = complete
+    df.attrs["history_start"] = None if pd.isna(first_date) else first_date.strftime("%Y-%m-%d")
+    return df
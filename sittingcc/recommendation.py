@@ -9,35 +9,25 @@ Recommendation tiers:
 Explanation:
     Selects the top 2 absolute contributors from the scoring dict and generates
     a short, plain-English sentence explaining today's score.
+
+Batch API:
+    assign_tiers() bins a whole score array against the TIERS thresholds with one
+    searchsorted call, and get_explanations() picks each row's top 2 contributors
+    with two argmax passes (no sort). An explanation depends only on which two
+    features lead and their signs, so every possible sentence is built once
+    from FEATURE_LABELS and rows just index into that table.
 """
 
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
+import numpy as np
+import pandas as pd
+
+from sittingcc import instrument
+# TIERS and assign_tiers live in the pandas-free kernel, re-exported from here
+from sittingcc.kernel import TIERS, assign_tiers
+from sittingcc.scoring import CONTRIBUTION_COLUMNS
 
-# Recommendation tiers with label and suggested workouts
-TIERS = [
-    {
-        "min": 80,
-        "label": "High Intensity / Long Aerobic",
-        "detail": "Your body is primed. Today is the day for intervals, a race-pace effort, or your long session.",
-        "color": "#2ecc71",
-        "emoji": "🟢"
-    },
-    {
-        "min": 50,
-        "label": "Tempo / Aerobic Base",
-        "detail": "Solid readiness. Stick to controlled, aerobic efforts — tempo runs, zone 2 rides, steady swims.",
-        "color": "#f39c12",
-        "emoji": "🟡"
-    },
-    {
-        "min": 0,
-        "label": "Recovery / Rest",
-        "detail": "Your body is signaling stress. Prioritize an easy spin, yoga, or full rest today.",
-        "color": "#e74c3c",
-        "emoji": "🔴"
-    },
-]
 
 # Human-readable descriptions for each feature contribution
 FEATURE_LABELS = {
@@ -92,6 +82,10 @@ def get_explanation(contributions: Dict[str, float]) -> str:
         direction = "positive" if value >= 0 else "negative"
         parts.append(FEATURE_LABELS[feature][direction])
 
+    return _explanation_sentence(parts)
+
+
+def _explanation_sentence(parts: List[str]) -> str:
     if not parts:
         return "Score driven by combined metrics across HRV, sleep, and training load."
 
@@ -101,6 +95,7 @@ def get_explanation(contributions: Dict[str, float]) -> str:
     return f"Today's score is primarily driven by {parts[0]}, and {parts[1]}."
 
 
+@instrument.instrumented
 def get_full_recommendation(score: float, contributions: Dict[str, float]) -> Tuple[Dict, str]:
     """
     Convenience wrapper: returns both recommendation tier and explanation string.
@@ -108,3 +103,89 @@ def get_full_recommendation(score: float, contributions: Dict[str, float]) -> Tu
     rec = get_recommendation(score)
     explanation = get_explanation(contributions)
     return rec, explanation
+
+
+def _explanation_table(labels: List[str]) -> np.ndarray:
+    """
+    Every explanation get_explanation can produce for these labels, indexed by
+    ((first * 2 + first_negative) * n + second) * 2 + second_negative.
+    """
+    n = len(labels)
+    table = np.empty(n * 2 * n * 2, dtype=object)
+    for first in range(n):
+        for first_neg in range(2):
+            for second in range(n):
+                for second_neg in range(2):
+                    parts = []
+                    for i, negative in ((first, first_neg), (second, second_neg)):
+                        if labels[i] in FEATURE_LABELS:
+                            direction = "negative" if negative else "positive"
+                            parts.append(FEATURE_LABELS[labels[i]][direction])
+                    code = ((first * 2 + first_neg) * n + second) * 2 + second_neg
+                    table[code] = _explanation_sentence(parts)
+    return table
+
+
+def get_explanations(contributions: np.ndarray, labels: List[str]) -> np.ndarray:
+    """
+    Vectorized get_explanation over a (rows × features) contribution matrix.
+
+    labels names the matrix columns, in the same order as the contribution dict
+    compute_score returns (ties between equal magnitudes resolve to the earlier
+    column, as the stable sort in get_explanation does). Rows containing NaN
+    get the insufficient-data message.
+
+    Returns an object array of explanation strings; identical sentences share
+    one string object.
+    """
+    contributions = np.asarray(contributions, dtype=np.float64)
+    rows, n = contributions.shape
+    if n < 2:
+        return np.array([get_explanation(dict(zip(labels, row))) for row in contributions], dtype=object)
+
+    magnitude = np.abs(contributions)
+    first = magnitude.argmax(axis=1)
+    masked = magnitude.copy()
+    masked[np.arange(rows), first] = -1.0
+    second = masked.argmax(axis=1)
+
+    picked = np.arange(rows)
+    first_neg = (contributions[picked, first] < 0).astype(np.intp)
+    second_neg = (contributions[picked, second] < 0).astype(np.intp)
+    codes = ((first * 2 + first_neg) * n + second) * 2 + second_neg
+
+    explanations = _explanation_table(labels)[codes]
+    explanations[np.isnan(contributions).any(axis=1)] = "Insufficient data to generate explanation."
+    return explanations
+
+
+# Tier labels indexed by assign_tiers output; -1 (unscored) picks the trailing NaN
+_TIER_LABELS = np.array([tier["label"] for tier in TIERS] + [np.nan], dtype=object)
+
+
+def recommendation_labels(scores: np.ndarray) -> np.ndarray:
+    """Tier label for every score (NaN when unscored), without explanations."""
+    return _TIER_LABELS[assign_tiers(scores)]
+
+
+@instrument.instrumented
+def recommend_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Batch get_full_recommendation over score_dataframe output.
+
+    Returns a DataFrame aligned to df.index with 'tier' (index into TIERS, -1
+    when unscored), 'recommendation' (tier label, NaN when unscored) and
+    'explanation' (None when unscored).
+    """
+    tiers = assign_tiers(df["readiness_score"].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    explanations = get_explanations(
+        df[list(CONTRIBUTION_COLUMNS.values())].to_numpy(dtype=np.float64, na_value=np.nan),
+        list(CONTRIBUTION_COLUMNS),
+    )
+    explanations[tiers < 0] = None
+
+    return pd.DataFrame(
+        {"tier": tiers, "recommendation": _TIER_LABELS[tiers], "explanation": explanations},
+        index=df.index,
+    )
@@ -0,0 +1,140 @@
+"""
+records.py — Compact representations of scored days.
+
+compute_score returns a fresh dict of four floats per day, and a scored
+float64 DataFrame costs ~144 bytes per athlete-day. Workers holding millions of
+days need something smaller:
+
+    Contributions  → __slots__ record of the four contributions (no per-day dict)
+    ScoredDay      → __slots__ record: date, score, tier index, Contributions
+    ScoredHistory  → array-backed sequence of scored days, 25 bytes per day
+                     (int32 day number, float32 score, int8 tier, 4 × float32
+                     contribution) that hands out ScoredDay records on access
+
+Scores and contributions are multiples of 0.1 below 1,000, so float32 storage
+loses nothing at the displayed precision: values are rounded back to one
+decimal when read and match the float64 pipeline to ~1e-14.
+"""
+
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.columnar import dates_to_days, days_to_dates
+from sittingcc.recommendation import TIERS, assign_tiers
+from sittingcc.scoring import CONTRIBUTION_COLUMNS
+
+# Packed row layout for ScoredHistory (no alignment padding)
+SCORED_DAY_DTYPE = np.dtype([
+    ("day", "<i4"),        # days since 1970-01-01
+    ("score", "<f4"),      # NaN when unscored
+    ("tier", "i1"),        # index into TIERS, -1 when unscored
+    ("hrv", "<f4"),
+    ("rhr", "<f4"),
+    ("sleep", "<f4"),
+    ("strain", "<f4"),
+])
+
+# Contribution label → ScoredHistory field, in compute_score's order
+CONTRIBUTION_FIELDS = dict(zip(CONTRIBUTION_COLUMNS, ("hrv", "rhr", "sleep", "strain")))
+
+
+class Contributions:
+    """The four contributions of one scored day."""
+
+    __slots__ = ("hrv", "rhr", "sleep", "strain")
+
+    def __init__(self, hrv: float, rhr: float, sleep: float, strain: float):
+        self.hrv = hrv
+        self.rhr = rhr
+        self.sleep = sleep
+        self.strain = strain
+
+    def as_dict(self) -> Dict[str, float]:
+        """{contribution label: value}, the shape compute_score returns."""
+        return {label: getattr(self, field) for label, field in CONTRIBUTION_FIELDS.items()}
+
+    def __repr__(self) -> str:
+        return f"Contributions(hrv={self.hrv}, rhr={self.rhr}, sleep={self.sleep}, strain={self.strain})"
+
+
+class ScoredDay:
+    """One scored day: date, readiness score, tier index and contributions."""
+
+    __slots__ = ("date", "readiness_score", "tier", "contributions")
+
+    def __init__(self, date: pd.Timestamp, readiness_score: float, tier: int, contributions: Contributions):
+        self.date = date
+        self.readiness_score = readiness_score
+        self.tier = tier
+        self.contributions = contributions
+
+    @property
+    def recommendation(self) -> Dict:
+        """The TIERS entry for this day (None when unscored)."""
+        return TIERS[self.tier] if self.tier >= 0 else None
+
+    def __repr__(self) -> str:
+        return f"ScoredDay({self.date:%Y-%m-%d}, score={self.readiness_score}, tier={self.tier})"
+
+
+def _one_decimal(value) -> float:
+    return round(float(value), 1)
+
+
+class ScoredHistory:
+    """
+    Array-backed sequence of scored days for one athlete.
+
+    Indexing returns a ScoredDay built on demand; the history itself holds a
+    single packed NumPy array.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "ScoredHistory":
+        """Pack score_dataframe output (date, readiness_score, contribution columns)."""
+        data = np.empty(len(df), dtype=SCORED_DAY_DTYPE)
+        data["day"] = dates_to_days(df["date"])
+        scores = df["readiness_score"].to_numpy(dtype=np.float64, na_value=np.nan)
+        data["score"] = scores
+        data["tier"] = assign_tiers(scores)
+        for label, field in CONTRIBUTION_FIELDS.items():
+            data[field] = df[CONTRIBUTION_COLUMNS[label]].to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, i: int) -> ScoredDay:
+        row = self.data[i]
+        return ScoredDay(
+            date=pd.Timestamp(int(row["day"]), unit="D"),
+            readiness_score=_one_decimal(row["score"]),
+            tier=int(row["tier"]),
+            contributions=Contributions(*(_one_decimal(row[f]) for f in ("hrv", "rhr", "sleep", "strain"))),
+        )
+
+    def __iter__(self) -> Iterator[ScoredDay]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Unpack to float64 columns named like score_dataframe output."""
+        df = pd.DataFrame({
+            "date": days_to_dates(self.data["day"]),
+            "readiness_score": self.data["score"].astype(np.float64).round(1),
+            "tier": self.data["tier"].astype(np.int64),
+        })
+        for label, field in CONTRIBUTION_FIELDS.items():
+            df[CONTRIBUTION_COLUMNS[label]] = self.data[field].astype(np.float64).round(1)
+        return df
@@ -0,0 +1,228 @@
+"""
+scorestore.py — Persistent per-athlete results with incremental recomputation.
+
+run_pipeline recomputes every feature and score on each call. A ScoreStore
+keeps, for each athlete, the inputs it last scored and everything derived
+from them, so an update only redoes the rows whose result can have changed.
+
+What each stored row depends on is recorded explicitly:
+    first_input[i]  → first input row in row i's feature windows; row i
+                      depends on input rows first_input[i] .. i. Negative
+                      for rows whose windows reach past the first row:
+                      those depend on where the history starts
+    weights_version → scoring parameters the stored scores were computed with
+    windows         → feature window config (DEFAULT_WINDOWS) the features
+                      were computed with
+
+On update(df), each athlete's new inputs (date + numeric columns) are compared
+with the stored ones:
+
+    1. The longest common prefix and suffix of rows are found by direct array
+       comparison. Everything between them is the changed span. This covers
+       appends, edits, inserts and deletes.
+    2. Prefix rows are reused as-is. A suffix row is reused only if every
+       input row it depends on is in the unchanged suffix. Windows are
+       measured in rows, so rows more than MAX_WINDOW - 1 after the change
+       keep the same inputs. Rows whose windows are still filling (negative
+       first_input) are never reused once rows are inserted before them.
+    3. The rest is recomputed by compute_features + score_columns, using
+       MAX_WINDOW - 1 rows of context before it.
+    4. Reused rows whose weights_version is stale are rescored from their
+       stored features (scoring only, no windows). A change to the window
+       config recomputes everything.
+
+Recomputing from a context window can differ from a full rerun in the last
+floating-point digit of a rolling mean, as in compute_features_stream. An
+unchanged athlete costs one file read and one array comparison.
+
+Layout (a directory): one <hash of athlete id>.npz file per athlete, written
+atomically (temp file + rename).
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.columnar import dates_to_days
+from sittingcc.data import ATHLETE_COLUMN, NUMERIC_COLUMNS
+from sittingcc.features import FEATURE_COLUMNS, MAX_WINDOW, compute_features
+from sittingcc.kernel import windows_version
+from sittingcc.recommendation import TIERS, assign_tiers
+from sittingcc.scoring import CONTRIBUTION_COLUMNS, score_columns, weights_version
+
+STORE_VERSION = 2
+
+INPUT_COLUMNS = ["day"] + NUMERIC_COLUMNS
+SCORE_COLUMNS = ["readiness_score"] + list(CONTRIBUTION_COLUMNS.values())
+
+
+def _first_input(n: int) -> np.ndarray:
+    """first_input for an athlete's n rows: windows reach back MAX_WINDOW - 1 rows."""
+    return np.arange(n) - (MAX_WINDOW - 1)
+
+
+def _changed_span(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> Tuple[int, int]:
+    """(common prefix length, common suffix length) of two input row sequences."""
+    n_old, n_new = len(old["day"]), len(new["day"])
+    m = min(n_old, n_new)
+    differs = np.zeros(m, dtype=bool)
+    for col in INPUT_COLUMNS:
+        differs |= old[col][:m] != new[col][:m]
+    prefix = int(differs.argmax()) if differs.any() else m
+
+    # The suffix may not overlap the prefix in either sequence
+    k = m - prefix
+    differs = np.zeros(k, dtype=bool)
+    for col in INPUT_COLUMNS:
+        differs |= old[col][n_old - k:][::-1] != new[col][n_new - k:][::-1]
+    suffix = int(differs.argmax()) if differs.any() else k
+    return prefix, suffix
+
+
+class ScoreStore:
+    """
+    Directory of per-athlete scored histories that updates incrementally.
+
+    Attributes:
+        path (str): store directory
+        report (dict): row counts from the last update() — 'reused',
+            'recomputed' (features + score), 'rescored' (score only, after a
+            weights change) and 'athletes'
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.report: Dict[str, int] = {}
+
+    def _file(self, athlete) -> str:
+        digest = hashlib.sha1(repr(athlete).encode()).hexdigest()[:16]
+        return os.path.join(self.path, f"{digest}.npz")
+
+    def _load(self, athlete) -> Optional[Dict[str, np.ndarray]]:
+        path = self._file(athlete)
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as f:
+            stored = {name: f[name] for name in f.files}
+        meta = json.loads(str(stored.pop("meta")))
+        if meta["version"] != STORE_VERSION or meta["athlete"] != repr(athlete):
+            return None
+        if meta["windows"] != windows_version():
+            return None   # features themselves are stale: recompute everything
+        stored["weights_version"] = meta["weights_version"]
+        return stored
+
+    def _save(self, athlete, arrays: Dict[str, np.ndarray]) -> None:
+        meta = {
+            "version": STORE_VERSION,
+            "athlete": repr(athlete),
+            "weights_version": weights_version(),
+            "windows": windows_version(),
+        }
+        path = self._file(athlete)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    def _update_athlete(self, athlete, df: pd.DataFrame, report: Dict[str, int]) -> Dict[str, np.ndarray]:
+        """Bring one athlete's stored results in line with df (load_data rows)."""
+        n = len(df)
+        new = {"day": dates_to_days(df["date"])}
+        for col in NUMERIC_COLUMNS:
+            new[col] = df[col].to_numpy(dtype=np.float64)
+
+        stored = self._load(athlete)
+        if stored is None:
+            prefix, suffix, n_old = 0, 0, 0
+        else:
+            prefix, suffix = _changed_span(stored, new)
+            n_old = len(stored["day"])
+
+        # First suffix row whose whole dependency span lies in the unchanged suffix
+        reuse_from = n
+        if suffix:
+            old_start = n_old - suffix
+            mapped = stored["first_input"][old_start:]
+            # A negative first_input is below any old_start, so rows still
+            # filling their windows are recomputed whenever rows precede them
+            reusable = np.flatnonzero(mapped >= old_start)
+            if len(reusable):
+                reuse_from = n - suffix + int(reusable[0])
+
+        out = {name: np.empty(n) for name in FEATURE_COLUMNS + SCORE_COLUMNS}
+        if prefix:
+            for name in out:
+                out[name][:prefix] = stored[name][:prefix]
+        if reuse_from < n:
+            shift = n_old - n
+            for name in out:
+                out[name][reuse_from:] = stored[name][reuse_from + shift:]
+
+        if prefix < reuse_from:
+            context = max(0, prefix - (MAX_WINDOW - 1))
+            featured = compute_features(df.iloc[context:reuse_from])
+            offset = prefix - context
+            for name in FEATURE_COLUMNS:
+                out[name][prefix:reuse_from] = featured[name].to_numpy(dtype=np.float64)[offset:]
+            scored = score_columns(featured.iloc[offset:])
+            for name in SCORE_COLUMNS:
+                out[name][prefix:reuse_from] = scored[name].to_numpy(dtype=np.float64)
+
+        reused = n - (reuse_from - prefix)
+        stale_weights = stored is not None and stored["weights_version"] != weights_version()
+        if stale_weights and reused:
+            # Reused features are still valid; only the formula changed
+            rows = np.r_[0:prefix, reuse_from:n]
+            features = pd.DataFrame({name: out[name][rows] for name in FEATURE_COLUMNS})
+            features["sleep_score"] = new["sleep_score"][rows]
+            scored = score_columns(features)
+            for name in SCORE_COLUMNS:
+                out[name][rows] = scored[name].to_numpy(dtype=np.float64)
+            report["rescored"] += reused
+        else:
+            report["reused"] += reused
+        report["recomputed"] += reuse_from - prefix
+
+        # Unchanged athletes are not rewritten
+        if stored is None or prefix < reuse_from or n != n_old or stale_weights:
+            self._save(athlete, {**new, **out, "first_input": _first_input(n)})
+        return out
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score df (load_data output, optionally multi-athlete), reusing stored results.
+
+        Stored results are brought in line with df: athletes missing from df
+        are left untouched. Returns df with the feature, score and contribution
+        columns of score_dataframe plus 'recommendation' (tier label, NaN when
+        unscored), and sets self.report.
+        """
+        report = {"reused": 0, "recomputed": 0, "rescored": 0, "athletes": 0}
+        if ATHLETE_COLUMN in df.columns:
+            ids = df[ATHLETE_COLUMN].to_numpy()
+            starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1]))) if len(df) else []
+            blocks: List[Tuple] = [
+                (ids[start], start, end) for start, end in zip(starts, list(starts[1:]) + [len(df)])
+            ]
+        else:
+            blocks = [(None, 0, len(df))] if len(df) else []
+
+        columns = {name: np.empty(len(df)) for name in FEATURE_COLUMNS + SCORE_COLUMNS}
+        for athlete, start, end in blocks:
+            results = self._update_athlete(athlete, df.iloc[start:end], report)
+            for name, values in results.items():
+                columns[name][start:end] = values
+            report["athletes"] += 1
+        self.report = report
+
+        out = df.copy()
+        for name, values in columns.items():
+            out[name] = values
+        labels = np.array([tier["label"] for tier in TIERS] + [np.nan], dtype=object)
+        out["recommendation"] = labels[assign_tiers(columns["readiness_score"])]
+        return out
@@ -16,80 +16,105 @@ Scoring formula:
 
     Final score is clamped to [0, 100].
 
+Batch scoring:
+    score_dataframe() evaluates the formula as whole-column NumPy operations
+    (see score_arrays) rather than calling compute_score row by row. Each
+    contribution is rounded to 0.1 before summing, exactly as compute_score does,
+    so both paths produce the same scores.
+
+Pandas-free core:
+    The parameters and both forms of the formula (score_arrays, score_row)
+    live in kernel.py, which imports only NumPy. This module adds the
+    DataFrame entry points on top.
+
 Design note:
     Weights are hand-tuned based on sports science literature and domain knowledge.
     HRV is weighted most heavily because it's the most sensitive and validated
     marker of autonomic recovery. A v2 would learn weights from labeled outcome data.
 """
 
+from typing import Dict, Tuple
+
 import numpy as np
 import pandas as pd
-from typing import Tuple, Dict
-
 
-BASE_SCORE = 70.0
+from sittingcc import instrument
+# Parameters and formula live in the pandas-free kernel, re-exported from here
+from sittingcc.kernel import BASE_SCORE, CONTRIBUTION_COLUMNS, WEIGHTS, score_arrays, score_row, weights_version
 
-# Contribution weights — see module docstring for rationale
-WEIGHTS = {
-    "hrv_pct":     120.0,
-    "rhr_delta":   -4.0,
-    "sleep_score": 0.25,   # applied as 0.25 * (sleep_score - 75)
-    "strain_ratio": -15.0, # applied as -15 * (strain_ratio - 1.0)
-}
 
-
-def compute_score(row: pd.Series) -> Tuple[float, Dict[str, float]]:
+def compute_score(row: pd.Series, weights: Dict[str, float] = None) -> Tuple[float, Dict[str, float]]:
     """
     Compute readiness score for a single row (a single day).
+    row may be a pd.Series or any mapping with .get().
+    weights overrides WEIGHTS (e.g. an athlete's calibrated weights).
 
     Returns:
         score (float): final clamped readiness score 0–100
         contributions (dict): each feature's contribution to the score delta from base
-    """
-    contributions = {}
-
-    # HRV deviation contribution
-    hrv_contrib = WEIGHTS["hrv_pct"] * row.get("hrv_pct", 0)
-    contributions["HRV vs Baseline"] = round(hrv_contrib, 1)
-
-    # RHR deviation contribution
-    rhr_contrib = WEIGHTS["rhr_delta"] * row.get("rhr_delta", 0)
-    contributions["Resting HR vs Baseline"] = round(rhr_contrib, 1)
 
-    # Sleep quality contribution (centered at 75)
-    sleep_contrib = WEIGHTS["sleep_score"] * (row.get("sleep_score", 75) - 75)
-    contributions["Sleep Quality"] = round(sleep_contrib, 1)
-
-    # Strain ratio contribution (centered at 1.0)
-    strain_ratio = row.get("strain_ratio", 1.0)
-    strain_contrib = WEIGHTS["strain_ratio"] * (strain_ratio - 1.0)
-    contributions["Training Load"] = round(strain_contrib, 1)
-
-    # Sum contributions on top of base
-    raw_score = BASE_SCORE + sum(contributions.values())
-
-    # Clamp to valid range
-    final_score = float(np.clip(raw_score, 0, 100))
-
-    return final_score, contributions
+    Hot per-row callers can skip the row lookups with kernel.score_row.
+    """
+    return score_row(
+        row.get("hrv_pct", 0),
+        row.get("rhr_delta", 0),
+        row.get("sleep_score", 75),
+        row.get("strain_ratio", 1.0),
+        weights,
+    )
+
+
+def score_columns(
+    df: pd.DataFrame, dtype: str = "float64", weights: Dict[str, np.ndarray] = None
+) -> pd.DataFrame:
+    """
+    Score a feature DataFrame in one columnar pass.
 
+    Returns a DataFrame aligned to df.index with a 'readiness_score' column plus
+    one column per contribution (see CONTRIBUTION_COLUMNS). Missing feature
+    columns follow compute_score's defaults: sleep_score → 75, strain_ratio → 1.0,
+    and rows without hrv_pct / rhr_delta are left unscored.
 
-def score_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    The formula is always evaluated in float64; dtype only sets the storage
+    type of the returned columns (float32 halves them). weights is passed to
+    score_arrays.
+    """
+    n = len(df)
+
+    def column(name: str, default: float) -> np.ndarray:
+        if name in df.columns:
+            return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.full(n, default)
+
+    scores, contributions = score_arrays(
+        column("hrv_pct", np.nan),
+        column("rhr_delta", np.nan),
+        column("sleep_score", 75.0),
+        column("strain_ratio", 1.0),
+        weights=weights,
+    )
+
+    out = pd.DataFrame({"readiness_score": scores.astype(dtype, copy=False)}, index=df.index)
+    for label, col in CONTRIBUTION_COLUMNS.items():
+        out[col] = contributions[label].astype(dtype, copy=False)
+    return out
+
+
+@instrument.instrumented
+def score_dataframe(
+    df: pd.DataFrame, dtype: str = "float64", weights: Dict[str, np.ndarray] = None, copy: bool = True
+) -> pd.DataFrame:
     """
-    Apply compute_score to every row in the DataFrame.
-    Adds a 'readiness_score' column.
+    Score every row in the DataFrame.
+    Adds a 'readiness_score' column and one column per contribution
+    (see CONTRIBUTION_COLUMNS), stored as dtype.
     Skips rows where required features are NaN.
+    weights overrides WEIGHTS (scalars or per-row arrays, see score_arrays).
+    copy=False transfers ownership: columns are added to df itself and df is returned.
     """
-    df = df.copy()
-    scores = []
-
-    for _, row in df.iterrows():
-        # Skip rows without enough rolling history
-        if pd.isna(row.get("hrv_pct")) or pd.isna(row.get("rhr_delta")):
-            scores.append(np.nan)
-        else:
-            score, _ = compute_score(row)
-            scores.append(score)
-
-    df["readiness_score"] = scores
+    if copy:
+        df = df.copy()
+    scored = score_columns(df, dtype=dtype, weights=weights)
+    for col in scored.columns:
+        df[col] = scored[col]
     return df
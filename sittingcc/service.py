@@ -0,0 +1,217 @@
+"""
+service.py — Headless scoring: a CLI and a local HTTP JSON endpoint, no Streamlit.
+
+Usage:
+    python -m sittingcc.service score history.csv       # latest score per athlete, as JSON
+    python -m sittingcc.service serve --port 8765       # HTTP endpoint
+
+Endpoints:
+    GET  /health  → {"status": "ok"}
+    POST /score   → body {"athletes": [{"athlete_id": "a1", "days": [{day}, ...]}, ...]}
+                    where each day has the CSV columns (date, hrv_ms, rhr_bpm,
+                    sleep_hours, sleep_score, strain)
+                  ← {"results": [{"athlete_id", "date", "readiness_score",
+                                  "contributions", "tier", "detail", "explanation"}, ...]}
+
+All athletes in one request are scored together in a single grouped pipeline
+pass, so per-request overhead is paid once, not once per athlete.
+
+Cold start:
+    This module imports only the standard library. pandas and the scoring
+    modules are imported on first use; `serve` binds the socket first and warms
+    those imports in a background thread, so the endpoint is reachable (and
+    /health answers) while pandas is still loading.
+"""
+
+import argparse
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+# Request bodies larger than this are rejected with 413. One /score request
+# carries a whole squad's histories, so this is 4× ingest.py's per-upload limit
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+def _warm_imports() -> None:
+    """Import the heavy modules the scoring path needs."""
+    import sittingcc.features  # noqa: F401
+    import sittingcc.recommendation  # noqa: F401
+    import sittingcc.scoring  # noqa: F401
+
+
+def latest_results(df_scored) -> List[Dict]:
+    """
+    Most recent scored day per athlete from score_dataframe output, as
+    JSON-ready dicts. Athletes without a scored day get an 'error' entry.
+    """
+    from sittingcc.data import ATHLETE_COLUMN
+    from sittingcc.recommendation import get_full_recommendation
+    from sittingcc.scoring import CONTRIBUTION_COLUMNS
+
+    if ATHLETE_COLUMN in df_scored.columns:
+        groups = df_scored.groupby(ATHLETE_COLUMN, sort=False)
+    else:
+        groups = [(None, df_scored)]
+
+    results = []
+    for athlete_id, df in groups:
+        valid = df.dropna(subset=["readiness_score"])
+        if valid.empty:
+            results.append({
+                "athlete_id": athlete_id,
+                "error": "Not enough data to compute scores. Need at least 3 days of data.",
+            })
+            continue
+
+        latest = valid.iloc[-1]
+        score = float(latest["readiness_score"])
+        contributions = {label: float(latest[col]) for label, col in CONTRIBUTION_COLUMNS.items()}
+        rec, explanation = get_full_recommendation(score, contributions)
+        results.append({
+            "athlete_id": athlete_id,
+            "date": latest["date"].strftime("%Y-%m-%d"),
+            "readiness_score": score,
+            "contributions": contributions,
+            "tier": rec["label"],
+            "detail": rec["detail"],
+            "explanation": explanation,
+        })
+    return results
+
+
+def score_payload(payload: Dict) -> Dict:
+    """
+    Score a /score request body. Raises ValueError on a malformed body.
+
+    Athletes without an athlete_id are numbered by their position in the list.
+    Athletes none of whose days are valid get an 'error' entry.
+    """
+    import pandas as pd
+
+    from sittingcc.data import ATHLETE_COLUMN, prepare_data
+    from sittingcc.features import compute_features
+    from sittingcc.scoring import score_dataframe
+
+    athletes = payload.get("athletes") if isinstance(payload, dict) else None
+    if not isinstance(athletes, list):
+        raise ValueError("Request body must be an object with an 'athletes' list")
+
+    frames = []
+    for i, athlete in enumerate(athletes):
+        days = athlete.get("days") if isinstance(athlete, dict) else None
+        if not isinstance(days, list) or not days:
+            raise ValueError(f"Athlete at index {i} has no 'days' list")
+        frame = pd.DataFrame(days)
+        frame[ATHLETE_COLUMN] = str(athlete.get("athlete_id", i))
+        frames.append(frame)
+
+    if not frames:
+        return {"results": []}
+
+    df = prepare_data(pd.concat(frames, ignore_index=True), source="Request", copy=False)
+    order = {str(a.get("athlete_id", i)): i for i, a in enumerate(athletes)}
+    results = latest_results(score_dataframe(compute_features(df, copy=False), copy=False))
+    # prepare_data drops invalid rows, so an athlete with none left has no group
+    scored_ids = {r["athlete_id"] for r in results}
+    results.extend(
+        {"athlete_id": athlete_id, "error": "No valid days: every day is missing a numeric value."}
+        for athlete_id in order if athlete_id not in scored_ids
+    )
+    results.sort(key=lambda r: order.get(r["athlete_id"], len(order)))
+    return {"results": results}
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """JSON request handler for /health and /score."""
+
+    def _send_json(self, status: int, body: Dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/score":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        header = self.headers.get("Content-Length") or "0"
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(400, {"error": f"Invalid Content-Length: {header!r}"})
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": f"Request body exceeds {MAX_BODY_BYTES} bytes"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length) or b"null")
+            self._send_json(200, score_payload(payload))
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+
+    def log_message(self, format: str, *args) -> None:
+        # Keep stdout clean for job runners; errors still go to stderr
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765) -> None:
+    """Run the HTTP endpoint until interrupted."""
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    threading.Thread(target=_warm_imports, daemon=True).start()
+    print(f"Scoring service listening on http://{host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def score_file(path: str) -> Dict:
+    """Latest score per athlete for a CSV path or columnar store."""
+    from sittingcc.data import load_data
+    from sittingcc.features import compute_features
+    from sittingcc.scoring import score_dataframe
+
+    return {"results": latest_results(score_dataframe(compute_features(load_data(path), copy=False), copy=False))}
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless Sitting CC scoring.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score_cmd = commands.add_parser("score", help="score a CSV or columnar store")
+    score_cmd.add_argument("path")
+
+    serve_cmd = commands.add_parser("serve", help="run the HTTP JSON endpoint")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args(argv)
+    if args.command == "score":
+        try:
+            json.dump(score_file(args.path), sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        except (OSError, ValueError) as e:
+            sys.exit(f"Error: {e}")
+    else:
+        serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
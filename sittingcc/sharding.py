@@ -0,0 +1,76 @@
+"""
+sharding.py — Run the scoring pipeline over a multi-athlete table across CPU cores.
+
+A long table (athlete_id column, as returned by load_data) is cut into shards
+at athlete boundaries, so every athlete's full history lands in exactly one
+shard. Each shard runs compute_features → score_dataframe in its own worker
+process and the scored shards are concatenated back in the original row order.
+
+Shards are balanced by row count, not athlete count — a handful of athletes
+with decade-long histories should not leave the other workers idle.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.data import ATHLETE_COLUMN
+from sittingcc.features import compute_features
+from sittingcc.scoring import score_dataframe
+
+
+def athlete_bounds(df: pd.DataFrame) -> np.ndarray:
+    """
+    Return row offsets where each athlete's block starts, plus len(df) at the end.
+
+    Assumes df is grouped by athlete (load_data sorts by athlete_id, then date).
+    """
+    ids = df[ATHLETE_COLUMN].to_numpy()
+    starts = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    return np.concatenate(([0], starts, [len(df)]))
+
+
+def shard_by_athlete(df: pd.DataFrame, n_shards: int) -> List[pd.DataFrame]:
+    """
+    Split df into at most n_shards contiguous slices of roughly equal row count,
+    never splitting an athlete across two slices.
+    """
+    if df.empty or ATHLETE_COLUMN not in df.columns or n_shards <= 1:
+        return [df]
+
+    bounds = athlete_bounds(df)
+    # Snap each ideal cut point (k * n / n_shards) to the next athlete boundary
+    targets = np.arange(1, n_shards) * len(df) / n_shards
+    cuts = bounds[np.searchsorted(bounds, targets)]
+    edges = np.unique(np.concatenate(([0], cuts, [len(df)])))
+
+    return [df.iloc[start:end] for start, end in zip(edges[:-1], edges[1:])]
+
+
+def score_shard(df: pd.DataFrame) -> pd.DataFrame:
+    """Features + scores for one shard. Runs inside a worker process."""
+    return score_dataframe(compute_features(df))
+
+
+def score_athletes(df: pd.DataFrame, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Score a multi-athlete table, fanning athlete shards out to a process pool.
+
+    Args:
+        df: output of load_data, optionally with an athlete_id column
+        workers: process count (default: os.cpu_count()); 1 runs in-process
+
+    Returns the scored DataFrame in the same row order as df.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shard_by_athlete(df, workers)
+
+    if len(shards) == 1:
+        return score_shard(shards[0])
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        scored = list(pool.map(score_shard, shards))
+    return pd.concat(scored)
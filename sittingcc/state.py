@@ -0,0 +1,278 @@
+"""
+state.py — Incremental per-athlete feature state: score a new day in O(1).
+
+A day's features only depend on the last 28 rows of history, so rerunning
+load_data → compute_features → score_dataframe over an athlete's full history
+for every new day is wasted work. AthleteState keeps just enough to extend the
+history by one day:
+
+    hrv_baseline_7d  → 7-slot ring buffer + running sum of hrv_ms
+    rhr_baseline_7d  → 7-slot ring buffer + running sum of rhr_bpm
+    strain_avg_28d   → 28-slot ring buffer + running sum of strain
+
+Each running mean follows the same add/remove algorithm pandas uses for
+rolling().mean() (Kahan-compensated sums, same min_periods), so a state fed the
+full history produces bit-identical features and scores to the batch pipeline.
+
+Robust baselines: AthleteState(windows=ROBUST_WINDOWS) (see windows.py) keeps a
+RollingMedian instead for every baseline whose spec has kind "median". It holds
+the window both as a ring buffer and as a sorted list: a push is one bisect
+insert and one bisect delete, the median is read by index, and the MAD is the
+median of two implicitly sorted deviation runs, found by binary search in
+O(log w). Its results equal compute_features(df, windows=ROBUST_WINDOWS).
+
+The state is plain data: to_dict() / from_dict() round-trip through JSON, so
+ingestion workers can persist it between days.
+
+Usage:
+    state = AthleteState.from_history(compute_features(load_data(path)))
+    result = state.append({"date": "2024-02-01", "hrv_ms": 61, "rhr_bpm": 52,
+                           "sleep_hours": 7.5, "sleep_score": 80, "strain": 11.2})
+    result["readiness_score"], result["recommendation"]["label"]
+"""
+
+import bisect
+import datetime
+import math
+from typing import Callable, Dict, Mapping, Optional, Union
+
+import pandas as pd
+
+from sittingcc.data import NUMERIC_COLUMNS
+from sittingcc.kernel import DEFAULT_WINDOWS, RollingMean, derive_features, score_row
+from sittingcc.recommendation import get_full_recommendation
+
+
+def _iso_date(value) -> str:
+    """Normalize a date-like value to 'YYYY-MM-DD' (fast path for ISO strings)."""
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value[:10]).isoformat()
+        except ValueError:
+            pass
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _kth_smallest(a: Callable[[int], float], len_a: int, b: Callable[[int], float], len_b: int, k: int) -> float:
+    """k-th smallest (0-based) of two ascending sequences, given as index → value."""
+    # Binary search on how many of the k + 1 smallest come from a
+    lo, hi = max(0, k + 1 - len_b), min(k + 1, len_a)
+    while lo < hi:
+        i = (lo + hi) // 2
+        if a(i) < b(k - i):
+            lo = i + 1
+        else:
+            hi = i
+    j = k + 1 - lo
+    return max(a(lo - 1) if lo else -math.inf, b(j - 1) if j else -math.inf)
+
+
+class RollingMedian:
+    """
+    Fixed-window running median (and MAD), matching pandas rolling().median().
+
+    push() adds one value (evicting the oldest once the window is full) and
+    returns the current median, or NaN while fewer than min_periods non-NaN
+    values are held. NaN values take a window slot but are not counted.
+    """
+
+    __slots__ = ("window", "min_periods", "buffer", "head", "filled", "ordered")
+
+    def __init__(self, window: int, min_periods: int):
+        self.window = window
+        self.min_periods = min_periods
+        self.buffer = [math.nan] * window
+        self.head = 0            # next slot to write; oldest value once full
+        self.filled = 0
+        self.ordered = []        # non-NaN values in the window, ascending
+
+    def push(self, value: float) -> float:
+        value = float(value)
+        if self.filled == self.window:
+            old = self.buffer[self.head]
+            if not math.isnan(old):
+                del self.ordered[bisect.bisect_left(self.ordered, old)]
+        else:
+            self.filled += 1
+        self.buffer[self.head] = value
+        self.head = (self.head + 1) % self.window
+        if not math.isnan(value):
+            bisect.insort(self.ordered, value)
+        return self.median()
+
+    def median(self) -> float:
+        ordered, n = self.ordered, len(self.ordered)
+        if n < self.min_periods or n == 0:
+            return math.nan
+        half = n // 2
+        return ordered[half] if n % 2 else (ordered[half - 1] + ordered[half]) / 2
+
+    def mad(self) -> float:
+        """Median absolute deviation from the median, NaN like median()."""
+        m = self.median()
+        if math.isnan(m):
+            return m
+        ordered, n = self.ordered, len(self.ordered)
+        # Deviations of values below m, nearest first, and of values ≥ m:
+        # two ascending runs whose merged median is the MAD
+        split = bisect.bisect_left(ordered, m)
+        below = lambda i: m - ordered[split - 1 - i]
+        above = lambda j: ordered[split + j] - m
+        half = n // 2
+        upper = _kth_smallest(below, split, above, n - split, half)
+        if n % 2:
+            return upper
+        return (_kth_smallest(below, split, above, n - split, half - 1) + upper) / 2
+
+    def to_dict(self) -> Dict:
+        return {"kind": "median", **{name: getattr(self, name) for name in self.__slots__}}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "RollingMedian":
+        rolling = cls(data["window"], data["min_periods"])
+        for name in cls.__slots__:
+            value = data[name]
+            setattr(rolling, name, list(value) if name in ("buffer", "ordered") else value)
+        return rolling
+
+
+Rolling = Union[RollingMean, RollingMedian]
+_ROLLING_KINDS = {"mean": RollingMean, "median": RollingMedian}
+
+
+def _rolling_from_spec(name: str, spec: Mapping) -> Rolling:
+    kind = spec.get("kind", "mean")
+    if kind not in _ROLLING_KINDS:
+        raise ValueError(f"Baseline '{name}' has kind '{kind}'; incremental state supports 'mean' and 'median'")
+    return _ROLLING_KINDS[kind](spec["window"], spec.get("min_periods", spec["window"]))
+
+
+def _rolling_from_dict(data: Mapping) -> Rolling:
+    return _ROLLING_KINDS[data.get("kind", "mean")].from_dict(data)
+
+
+class AthleteState:
+    """
+    Rolling-window state for one athlete. append(day) scores a day in O(1).
+
+    Window sizes and min_periods match compute_features. windows overrides
+    baseline specs by feature name, as compute_features(df, windows=...) does:
+    mean and median kinds are supported, other names in it are ignored.
+
+    Raises ValueError for a baseline spec of another kind.
+    """
+
+    __slots__ = ("hrv", "rhr", "strain", "last_date", "days_seen")
+
+    def __init__(self, windows: Mapping[str, Mapping] = None):
+        specs = {**DEFAULT_WINDOWS, **(windows or {})}
+        self.hrv = _rolling_from_spec("hrv_baseline_7d", specs["hrv_baseline_7d"])
+        self.rhr = _rolling_from_spec("rhr_baseline_7d", specs["rhr_baseline_7d"])
+        self.strain = _rolling_from_spec("strain_avg_28d", specs["strain_avg_28d"])
+        self.last_date: Optional[str] = None
+        self.days_seen = 0
+
+    def append(self, day: Mapping) -> Dict:
+        """
+        Add one day (mapping with date + the numeric CSV columns) and score it.
+
+        Returns a dict with the day's 'date', 'features', 'readiness_score'
+        (NaN without enough history), 'contributions', 'recommendation' (tier
+        dict, or None when unscored) and 'explanation'.
+
+        Raises ValueError if a required value is missing or non-numeric, or if
+        the day is earlier than the last appended day.
+        """
+        values = {}
+        for col in NUMERIC_COLUMNS:
+            try:
+                values[col] = float(day[col])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Day is missing a numeric value for '{col}'")
+            if math.isnan(values[col]):
+                raise ValueError(f"Day is missing a numeric value for '{col}'")
+
+        date = _iso_date(day["date"])
+        if self.last_date is not None and date < self.last_date:
+            raise ValueError(f"Day {date} is earlier than last appended day {self.last_date}")
+
+        hrv_baseline = self.hrv.push(values["hrv_ms"])
+        rhr_baseline = self.rhr.push(values["rhr_bpm"])
+        strain_avg = self.strain.push(values["strain"])
+        self.last_date = date
+        self.days_seen += 1
+
+        # compute_features' own expressions, on 0-d arrays so that a zero
+        # baseline divides like an array would (inf / NaN, no exception)
+        derived = derive_features(
+            values["hrv_ms"], values["rhr_bpm"], values["strain"], hrv_baseline, rhr_baseline, strain_avg
+        )
+        features = {
+            "hrv_baseline_7d": hrv_baseline,
+            "rhr_baseline_7d": rhr_baseline,
+            "strain_avg_28d": strain_avg,
+            **derived,
+        }
+        features = {name: float(value) for name, value in features.items()}
+
+        result = {
+            "date": date,
+            "features": features,
+            "readiness_score": math.nan,
+            "contributions": {},
+            "recommendation": None,
+            "explanation": "Insufficient data to generate explanation.",
+        }
+        # Skip rows without enough rolling history, as score_dataframe does
+        if math.isnan(features["hrv_pct"]) or math.isnan(features["rhr_delta"]):
+            return result
+
+        score, contributions = score_row(
+            features["hrv_pct"], features["rhr_delta"], values["sleep_score"], features["strain_ratio"]
+        )
+        result["readiness_score"] = score
+        result["contributions"] = contributions
+        if not math.isnan(score):
+            rec, explanation = get_full_recommendation(score, contributions)
+            result["recommendation"] = rec
+            result["explanation"] = explanation
+        return result
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, windows: Mapping[str, Mapping] = None) -> "AthleteState":
+        """
+        Build the state by replaying a loaded, date-sorted single-athlete history.
+
+        Replaying the full history reproduces the batch features exactly; replaying
+        only the last 28 rows is enough for the windows but may differ from the
+        batch result in the last floating-point digit (medians are exact).
+        """
+        state = cls(windows)
+        for hrv, rhr, strain in zip(df["hrv_ms"], df["rhr_bpm"], df["strain"]):
+            state.hrv.push(hrv)
+            state.rhr.push(rhr)
+            state.strain.push(strain)
+        if len(df):
+            state.last_date = _iso_date(df["date"].iloc[-1])
+        state.days_seen = len(df)
+        return state
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable snapshot of the state."""
+        return {
+            "hrv": self.hrv.to_dict(),
+            "rhr": self.rhr.to_dict(),
+            "strain": self.strain.to_dict(),
+            "last_date": self.last_date,
+            "days_seen": self.days_seen,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "AthleteState":
+        state = cls()
+        state.hrv = _rolling_from_dict(data["hrv"])
+        state.rhr = _rolling_from_dict(data["rhr"])
+        state.strain = _rolling_from_dict(data["strain"])
+        state.last_date = data["last_date"]
+        state.days_seen = data["days_seen"]
+        return state
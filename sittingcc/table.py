@@ -0,0 +1,111 @@
+"""
+table.py — Windowed history table: server-side filter, sort, paging and CSV export.
+
+The "Full Data" table used to string-format every valid row and send the whole
+frame to the browser. The work here is split so that only the visible page is
+ever formatted or transferred:
+
+    1. select_rows() filters (tier, date range, score band) and sorts on the
+       typed columns and returns row positions. No frame is copied.
+    2. format_page() slices one page of those positions and formats only it.
+    3. iter_csv() writes the selected rows as CSV text, CSV_CHUNK_ROWS at a
+       time, so an export never builds a formatted copy of the full history.
+
+Positions are plain integer arrays, so the app can cache them per filter/sort
+and flip through pages cheaply.
+"""
+
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.data import DATE_FORMAT
+
+TABLE_COLUMNS = [
+    "date", "hrv_ms", "rhr_bpm", "sleep_hours", "sleep_score",
+    "strain", "readiness_score", "recommendation",
+]
+PAGE_SIZE = 50
+CSV_CHUNK_ROWS = 10_000
+
+
+def _take(df: pd.DataFrame, rows: np.ndarray) -> pd.DataFrame:
+    """TABLE_COLUMNS of the given rows only (df[TABLE_COLUMNS] would copy every row)."""
+    return df.iloc[rows, df.columns.get_indexer(TABLE_COLUMNS)]
+
+
+def select_rows(
+    df: pd.DataFrame,
+    tiers: Optional[Sequence[str]] = None,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+    score_range: Optional[Tuple[float, float]] = None,
+    sort_by: str = "date",
+    descending: bool = False,
+) -> np.ndarray:
+    """
+    Row positions of df matching the filters, in sort order.
+
+    tiers filters on the 'recommendation' label, start/end on date (inclusive)
+    and score_range on readiness_score (inclusive). Sorting is stable, so rows
+    with equal keys keep date order whichever direction is chosen.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if tiers is not None:
+        mask &= np.isin(df["recommendation"].to_numpy(), list(tiers))
+    if start is not None:
+        mask &= (df["date"] >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        mask &= (df["date"] <= pd.Timestamp(end)).to_numpy()
+    if score_range is not None:
+        score = df["readiness_score"].to_numpy()
+        mask &= (score >= score_range[0]) & (score <= score_range[1])
+    rows = np.flatnonzero(mask)
+
+    keys = df[sort_by].to_numpy()[rows]
+    if descending:
+        # Stable descending: sort the reversed keys, then map back and flip
+        order = len(rows) - 1 - np.argsort(keys[::-1], kind="stable")[::-1]
+    else:
+        order = np.argsort(keys, kind="stable")
+    return rows[order]
+
+
+def page_count(n_rows: int, page_size: int = PAGE_SIZE) -> int:
+    """Number of pages for n_rows (at least 1, so an empty table has a page)."""
+    return max(1, -(-n_rows // page_size))
+
+
+def format_page(
+    df: pd.DataFrame,
+    rows: np.ndarray,
+    page: int,
+    page_size: int = PAGE_SIZE,
+) -> pd.DataFrame:
+    """Display-formatted rows for one page (1-based) of the selected positions."""
+    page_rows = rows[(page - 1) * page_size: page * page_size]
+    page_df = _take(df, page_rows).reset_index(drop=True)
+    page_df["date"] = page_df["date"].dt.strftime(DATE_FORMAT)
+    page_df["readiness_score"] = page_df["readiness_score"].round(1)
+    return page_df
+
+
+def iter_csv(
+    df: pd.DataFrame,
+    rows: Optional[np.ndarray] = None,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+) -> Iterator[str]:
+    """
+    CSV text for df[TABLE_COLUMNS] (optionally only `rows`), one chunk at a time.
+
+    The first chunk is the header. Concatenating every chunk gives the same
+    text as to_csv() on the whole selection.
+    """
+    if rows is None:
+        rows = np.arange(len(df))
+    yield ",".join(TABLE_COLUMNS) + "\n"
+    for lo in range(0, len(rows), chunk_rows):
+        chunk = _take(df, rows[lo:lo + chunk_rows])
+        yield chunk.to_csv(index=False, header=False, date_format=DATE_FORMAT)
+
@@ -0,0 +1,164 @@
+"""
+tail.py — Tail-only loading: the last N days of a history plus window warm-up.
+
+Today's score only needs the last MAX_WINDOW rows, and the dashboard's default
+views only show a recent window, yet load_data parses, sorts and validates the
+whole file before anything renders. These loaders read only the end:
+
+    read_tail(source, days)   → CSV path / bytes / binary file object: reads
+                                backwards from the end in growing blocks until
+                                the last `days` days plus `warmup` earlier rows
+                                are in hand, then runs prepare_data on just those
+    store_tail(store, days)   → columnar store: one searchsorted on the date
+                                column, then a zero-copy row slice
+
+Both return a Tail: a load_data-shaped frame, how many of its leading rows are
+warm-up (rows that only feed the rolling windows), whether it holds the
+whole history, and the date of the history's first row.
+
+pipeline.run_pipeline_tail() scores a Tail and drops the warm-up rows, so every
+row it returns has full rolling windows. As with compute_features_stream,
+windows restarted at the warm-up rows can differ from a full-history run in
+the last floating-point digit.
+
+CSV tails need a single-athlete file sorted by date. read_tail returns None
+when it cannot vouch for that: an athlete_id column, dates out of order in
+the tail, or a first row whose date is missing, does not parse or is after
+the tail's. Callers then load the whole file.
+"""
+
+import csv
+import io
+import os
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from sittingcc.columnar import HistoryStore, days_to_dates
+from sittingcc.data import ATHLETE_COLUMN, prepare_data
+from sittingcc.features import MAX_WINDOW
+
+# Rows before the first wanted day that complete its rolling windows
+TAIL_WARMUP = MAX_WINDOW - 1
+
+# The first backwards read is sized from the first row's length (with this
+# much slack per row); each further read covers 4× as much of the file
+_ROW_BYTES_SLACK = 1.5
+_MIN_BLOCK_BYTES = 4096
+
+
+class Tail(NamedTuple):
+    df: pd.DataFrame          # load_data-shaped rows: warm-up rows, then the wanted days
+    warmup: int               # leading rows of df that only feed the windows
+    complete: bool            # df starts at the history's first row
+    first_date: pd.Timestamp  # date of the history's first row
+
+
+def _trim(df: pd.DataFrame, days: int, warmup: int) -> pd.DataFrame:
+    """Rows from `warmup` rows before the last `days` days through the end."""
+    dates = df["date"].to_numpy()
+    cutoff = dates[-1] - np.timedelta64(days - 1, "D")
+    first_wanted = int(np.searchsorted(dates, cutoff))
+    return df.iloc[max(0, first_wanted - warmup):].reset_index(drop=True)
+
+
+def read_tail(source, days: int, warmup: int = TAIL_WARMUP) -> Optional[Tail]:
+    """
+    The last `days` days of a date-sorted, single-athlete CSV plus `warmup`
+    earlier rows, without parsing the rest of the file.
+
+    source is a path, raw bytes or a seekable binary file object; a file
+    object is left positioned at its start. Returns None when the file cannot
+    be read from the tail (see module docstring).
+    """
+    if isinstance(source, bytes):
+        f, close = io.BytesIO(source), False
+    elif isinstance(source, (str, os.PathLike)):
+        f, close = open(source, "rb"), True
+    else:
+        f, close = source, False
+    try:
+        return _read_tail(f, days, warmup)
+    finally:
+        if close:
+            f.close()
+        else:
+            f.seek(0)
+
+
+def _read_tail(f, days: int, warmup: int) -> Optional[Tail]:
+    f.seek(0)
+    header = f.readline()
+    data_start = f.tell()
+    first_line = f.readline()
+    names = next(csv.reader([header.decode("utf-8-sig")]), [])
+    if "date" not in names or ATHLETE_COLUMN in names or not first_line.strip():
+        return None   # load_data reports schema problems and handles the rest
+
+    try:
+        first_date = pd.to_datetime(next(csv.reader([first_line.decode()]))[names.index("date")])
+    except (ValueError, IndexError):
+        return None   # load_data reports the bad row
+    if pd.isna(first_date):
+        return None
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+
+    block = max(_MIN_BLOCK_BYTES, int(len(first_line) * _ROW_BYTES_SLACK * (days + warmup + 1)))
+    while True:
+        start = max(data_start, size - block)
+        f.seek(start)
+        chunk = f.read(size - start)
+        if start > data_start:
+            newline = chunk.find(b"\n")
+            if newline < 0:
+                block *= 4
+                continue
+            chunk = chunk[newline + 1:]   # drop the partial first line
+
+        raw = pd.read_csv(io.BytesIO(header + chunk), parse_dates=["date"])
+        if not raw["date"].is_monotonic_increasing:
+            return None
+        df = prepare_data(raw, source="CSV", copy=False)
+        at_start = start == data_start
+        if df.empty:
+            if at_start:
+                return None
+            block *= 4
+            continue
+
+        trimmed = _trim(df, days, warmup)
+        if len(trimmed) < len(df) or at_start:
+            break
+        block *= 4   # fewer than `warmup` rows precede the wanted days so far
+
+    if first_date > trimmed["date"].iloc[0]:
+        return None   # the file is not sorted by date
+    complete = at_start and len(trimmed) == len(df)
+    return Tail(trimmed, len(trimmed) - len(_trim(trimmed, days, 0)), complete, first_date)
+
+
+def store_tail(store: HistoryStore, days: int, athlete=None, warmup: int = TAIL_WARMUP) -> Tail:
+    """
+    The last `days` days of one athlete's history in a columnar store, plus
+    `warmup` earlier rows. athlete may be omitted for single-athlete stores.
+
+    Raises ValueError if the store holds several athletes and none is given,
+    KeyError for an unknown athlete.
+    """
+    if athlete is not None:
+        rows = store.athlete_slice(athlete)
+    elif store.athletes is None or len(store.athletes) == 1:
+        rows = slice(0, len(store))
+    else:
+        raise ValueError("Store holds several athletes; pass athlete=")
+
+    day_numbers = store.days[rows]
+    if not len(day_numbers):
+        return Tail(store.to_dataframe(rows), 0, True, pd.NaT)
+    first_wanted = int(np.searchsorted(day_numbers, day_numbers[-1] - (days - 1)))
+    start = max(0, first_wanted - warmup)
+    df = store.to_dataframe(slice(rows.start + start, rows.stop))
+    first_date = pd.Timestamp(days_to_dates(day_numbers[:1])[0])
+    return Tail(df, first_wanted - start, start == 0, first_date)
@@ -0,0 +1,166 @@
+"""
+whatif.py — Vectorized what-if simulator for planned days.
+
+"What would tomorrow's score be after a hard session today?" used to mean
+copying the history and rerunning compute_features and score_dataframe once
+per scenario. simulate() instead starts from an athlete's AthleteState and
+scores thousands of hypothetical days in one pass:
+
+    - each RollingMean is copied into a _RollingBatch holding one window per
+      scenario (S × window array), and pushed with the same Kahan-compensated
+      arithmetic, so every scenario matches AthleteState.append bit for bit
+    - features and scores are computed with score_arrays / assign_tiers over
+      the whole S × days block
+
+Multi-day scenarios loop over days only (the windows carry forward), never
+over scenarios. The caller's state is never modified.
+
+simulate_grid() builds the Cartesian product of slider values and returns
+score and tier surfaces shaped by those axes.
+"""
+
+from typing import Dict, Mapping
+
+import numpy as np
+
+from sittingcc.kernel import RollingMean, assign_tiers, derive_features, score_arrays
+from sittingcc.state import AthleteState
+
+# Inputs a scenario sets for each simulated day
+SCENARIO_COLUMNS = ["hrv_ms", "rhr_bpm", "sleep_score", "strain"]
+
+
+class _RollingBatch:
+    """
+    RollingMean.push applied to S independent copies of one window at once.
+    Values are never NaN (AthleteState.append rejects them), so the count of
+    non-NaN values is the same for every copy.
+    """
+
+    def __init__(self, rolling: RollingMean, n: int):
+        self.window = rolling.window
+        self.min_periods = rolling.min_periods
+        self.head = rolling.head     # same for every copy: all push in lockstep
+        self.filled = rolling.filled
+        self.nobs = rolling.nobs
+        self.buffer = np.tile(np.asarray(rolling.buffer, dtype=np.float64), (n, 1))
+        self.sum_x = np.full(n, rolling.sum_x)
+        self.comp_add = np.full(n, rolling.comp_add)
+        self.comp_remove = np.full(n, rolling.comp_remove)
+        self.neg_ct = np.full(n, rolling.neg_ct)
+        self.same_count = np.full(n, rolling.same_count)
+        self.prev_value = np.full(n, rolling.prev_value)
+
+    def push(self, value: np.ndarray) -> np.ndarray:
+        # Evict the value leaving the window (Kahan-compensated subtraction)
+        if self.filled == self.window:
+            old = self.buffer[:, self.head].copy()
+            self.nobs -= 1
+            y = -old - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            self.neg_ct = self.neg_ct - np.signbit(old)
+        else:
+            self.filled += 1
+
+        # Add the new value (Kahan-compensated addition)
+        self.buffer[:, self.head] = value
+        self.head = (self.head + 1) % self.window
+        self.nobs += 1
+        y = value - self.comp_add
+        t = self.sum_x + y
+        self.comp_add = t - self.sum_x - y
+        self.sum_x = t
+        self.neg_ct = self.neg_ct + np.signbit(value)
+        self.same_count = np.where(value == self.prev_value, self.same_count + 1, 1)
+        self.prev_value = value
+
+        return self.mean()
+
+    def mean(self) -> np.ndarray:
+        if self.nobs < self.min_periods or self.nobs == 0:
+            return np.full(len(self.sum_x), np.nan)
+        result = self.sum_x / self.nobs
+        result = np.where((self.neg_ct == 0) & (result < 0), 0.0, result)
+        result = np.where((self.neg_ct == self.nobs) & (result > 0), 0.0, result)
+        return np.where(self.same_count >= self.nobs, self.prev_value, result)
+
+
+def simulate(state: AthleteState, scenarios: Mapping, weights: Dict = None) -> Dict[str, np.ndarray]:
+    """
+    Score hypothetical next days for one athlete.
+
+    scenarios maps each of SCENARIO_COLUMNS to a scalar, an (S,) array (one
+    day per scenario) or an (S, days) array (a multi-day plan per scenario).
+    Everything is broadcast to a common (S, days) shape. weights is passed to
+    score_arrays (e.g. an athlete's calibrated weights).
+
+    Returns a dict of (S, days) arrays: 'readiness_score' (NaN while the
+    windows are still warming up), 'tier' (index into TIERS, -1 when
+    unscored) and one array per contribution label.
+
+    Raises ValueError if a scenario column is missing, or if the state keeps a
+    median baseline (only running means are batched).
+    """
+    if not all(isinstance(rolling, RollingMean) for rolling in (state.hrv, state.rhr, state.strain)):
+        raise ValueError("simulate() needs mean baselines; this state uses a median baseline")
+    missing = [col for col in SCENARIO_COLUMNS if col not in scenarios]
+    if missing:
+        raise ValueError(f"Scenarios are missing columns: {missing}")
+
+    # Scalars → (1, 1), (S,) → (S, 1); then broadcast to a common (S, days)
+    inputs = [np.asarray(scenarios[col], dtype=np.float64) for col in SCENARIO_COLUMNS]
+    inputs = [values.reshape(-1, 1) if values.ndim < 2 else values for values in inputs]
+    hrv_ms, rhr_bpm, sleep_score, strain = np.broadcast_arrays(*inputs)
+    n, days = hrv_ms.shape
+
+    hrv = _RollingBatch(state.hrv, n)
+    rhr = _RollingBatch(state.rhr, n)
+    load = _RollingBatch(state.strain, n)
+
+    hrv_baseline = np.empty((n, days))
+    rhr_baseline = np.empty((n, days))
+    strain_avg = np.empty((n, days))
+    for d in range(days):
+        hrv_baseline[:, d] = hrv.push(hrv_ms[:, d])
+        rhr_baseline[:, d] = rhr.push(rhr_bpm[:, d])
+        strain_avg[:, d] = load.push(strain[:, d])
+
+    derived = derive_features(hrv_ms, rhr_bpm, strain, hrv_baseline, rhr_baseline, strain_avg)
+    scores, contributions = score_arrays(
+        derived["hrv_pct"], derived["rhr_delta"], sleep_score, derived["strain_ratio"], weights
+    )
+    return {
+        "readiness_score": scores,
+        "tier": assign_tiers(scores.ravel()).reshape(scores.shape),
+        **contributions,
+    }
+
+
+def simulate_grid(state: AthleteState, days: int = 1, weights: Dict = None, **axes) -> Dict[str, np.ndarray]:
+    """
+    Score surfaces over the Cartesian product of scenario axes.
+
+    Each of SCENARIO_COLUMNS is given as a keyword: a scalar holds it fixed,
+    a 1-D array makes it a grid axis. The same values are repeated on each of
+    the `days` simulated days.
+
+    Returns simulate()'s arrays reshaped to (len(axis_1), ..., len(axis_k), days),
+    with axes in keyword order, plus 'axes': {name: values} for the varying ones.
+    """
+    varying = {name: np.asarray(values, dtype=np.float64) for name, values in axes.items()
+               if np.ndim(values) == 1}
+    shape = tuple(len(values) for values in varying.values())
+    mesh = np.meshgrid(*varying.values(), indexing="ij") if varying else []
+
+    scenarios = {name: values for name, values in axes.items() if name not in varying}
+    for name, values in zip(varying, mesh):
+        scenarios[name] = np.repeat(values.reshape(-1, 1), days, axis=1)
+    if not varying:
+        scenarios = {name: np.full((1, days), float(value)) for name, value in scenarios.items()}
+
+    result = simulate(state, scenarios, weights)
+    surfaces = {name: values.reshape(shape + (days,)) for name, values in result.items()}
+    surfaces["axes"] = varying
+    return surfaces
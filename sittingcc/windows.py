@@ -0,0 +1,204 @@
+"""
+windows.py — Configurable multi-window feature engine.
+
+A window spec maps an output column name to a dict:
+
+    {"column": "strain", "kind": "mean", "window": 28, "min_periods": 7}
+    {"column": "strain", "kind": "ewma", "span": 28, "min_periods": 7}
+    {"column": "hrv_ms", "kind": "median", "window": 7, "min_periods": 3}
+
+    mean   → trailing simple moving average over `window` rows
+    median → trailing median over `window` rows; one glitched reading cannot
+             move it the way it moves a mean
+    mad    → trailing median absolute deviation from that window's median
+             (unscaled; multiply by 1.4826 for a normal-consistent spread)
+    ewma   → exponentially weighted moving average with alpha = 2 / (span + 1),
+             computed recursively: y[0] = x[0], y[t] = (1 - alpha) y[t-1] + alpha x[t]
+             (pandas ewm(span=..., adjust=False, ignore_na=True))
+
+min_periods defaults to the window length for means, medians and MADs, and
+to 1 for EWMAs.
+
+window_features() evaluates any set of specs over a table in one go:
+
+    - Athlete blocks are found once and shared by every spec; no window ever
+      spans two athletes, and there is no groupby.
+    - Each input column is converted to a float64 array once, however many
+      specs read it.
+    - Means use pandas' compiled rolling kernel with per-row window bounds
+      clipped at the row's athlete block. The result is bit-identical to the
+      per-athlete rolling().mean() that compute_features used before.
+    - Medians use pandas' compiled skiplist rolling median (O(log w) per row
+      added or removed) with the same clipped bounds; MADs sort each window's
+      deviations from it (vectorized over chunks of rows) and take the middle.
+    - EWMAs are solved for all rows at once as a linear recurrence by
+      log-step doubling, with the carry reset at each athlete's first row.
+
+DEFAULT_WINDOWS reproduces compute_features' baselines; LOAD_WINDOWS adds
+14/42-day means and the 7/28-day acute/chronic EWMA load. ROBUST_WINDOWS
+swaps the 7-day HRV / RHR baselines for medians and adds their MADs; any spec
+named after a baseline replaces it, so robust baselines are chosen per
+feature and the scoring interface is unchanged.
+"""
+
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+from sittingcc.data import ATHLETE_COLUMN
+# compute_features' rolling baselines, shared with the pandas-free kernel
+from sittingcc.kernel import DEFAULT_WINDOWS, block_starts as _block_start
+
+
+# Extra training-load windows (opt-in: compute_features(df, windows=LOAD_WINDOWS))
+LOAD_WINDOWS = {
+    "strain_avg_14d": {"column": "strain", "kind": "mean", "window": 14, "min_periods": 4},
+    "strain_avg_42d": {"column": "strain", "kind": "mean", "window": 42, "min_periods": 14},
+    "strain_ewma_7d": {"column": "strain", "kind": "ewma", "span": 7, "min_periods": 3},     # acute load
+    "strain_ewma_28d": {"column": "strain", "kind": "ewma", "span": 28, "min_periods": 7},   # chronic load
+}
+
+# Robust baselines (opt-in: compute_features(df, windows=ROBUST_WINDOWS)); state.py
+# has the matching incremental RollingMedian
+ROBUST_WINDOWS = {
+    "hrv_baseline_7d": {"column": "hrv_ms", "kind": "median", "window": 7, "min_periods": 3},
+    "rhr_baseline_7d": {"column": "rhr_bpm", "kind": "median", "window": 7, "min_periods": 3},
+    "hrv_mad_7d": {"column": "hrv_ms", "kind": "mad", "window": 7, "min_periods": 3},
+    "rhr_mad_7d": {"column": "rhr_bpm", "kind": "mad", "window": 7, "min_periods": 3},
+}
+
+# Rows per chunk of the (rows × window) deviation matrix in _rolling_mad
+_MAD_CHUNK_ROWS = 65_536
+
+# Doubling stops once every remaining carry weight is below this
+_NEGLIGIBLE_WEIGHT = 2.0 ** -64
+
+
+class _BlockWindow(BaseIndexer):
+    """Trailing windows of window_size rows, clipped at each row's block start."""
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = np.maximum(end - self.window_size, self.block_start)
+        return start, end
+
+
+def _rolling_mean(x: np.ndarray, window: int, min_periods: int, block_start: np.ndarray) -> np.ndarray:
+    indexer = _BlockWindow(window_size=window, block_start=block_start)
+    return pd.Series(x).rolling(indexer, min_periods=min_periods).mean().to_numpy()
+
+
+def _rolling_median(x: np.ndarray, window: int, min_periods: int, block_start: np.ndarray) -> np.ndarray:
+    indexer = _BlockWindow(window_size=window, block_start=block_start)
+    return pd.Series(x).rolling(indexer, min_periods=min_periods).median().to_numpy()
+
+
+def _rolling_mad(x: np.ndarray, median: np.ndarray, window: int, block_start: np.ndarray) -> np.ndarray:
+    """Median of |x - window median| over the windows _rolling_median produced median for."""
+    out = np.full(len(x), np.nan)
+    rows = np.flatnonzero(~np.isnan(median))
+    back = np.arange(window)
+    for lo in range(0, len(rows), _MAD_CHUNK_ROWS):
+        chunk = rows[lo:lo + _MAD_CHUNK_ROWS]
+        positions = chunk[:, None] - back
+        inside = positions >= block_start[chunk, None]
+        values = np.where(inside, x[np.maximum(positions, 0)], np.nan)
+        # NaN deviations (missing or outside the block) sort last; every row
+        # holds at least min_periods values, so its middle is in range
+        deviations = np.sort(np.abs(values - median[chunk, None]), axis=1)
+        count = (~np.isnan(deviations)).sum(axis=1)
+        lower = np.take_along_axis(deviations, ((count - 1) // 2)[:, None], axis=1)[:, 0]
+        upper = np.take_along_axis(deviations, (count // 2)[:, None], axis=1)[:, 0]
+        out[chunk] = (lower + upper) / 2
+    return out
+
+
+def _ewma(x: np.ndarray, span: float, min_periods: int, block_start: np.ndarray) -> np.ndarray:
+    """
+    Per-block EWMA (adjust=False). Missing values carry the previous average
+    forward and do not count towards min_periods.
+    """
+    n = len(x)
+    alpha = 2.0 / (span + 1.0)
+    valid = ~np.isnan(x)
+    positions = np.arange(n)
+
+    # A block's first valid value starts the average: y = x there, no carry
+    seen = np.cumsum(valid)
+    seen_before_block = (seen - valid)[block_start]
+    first = valid & (seen - seen_before_block == 1)
+
+    decay = np.where(valid, 1.0 - alpha, 1.0)
+    decay[first] = 0.0
+    decay[positions == block_start] = 0.0
+    y = np.where(valid, alpha * x, 0.0)
+    y[first] = x[first]
+
+    # Solve y[t] = decay[t] * y[t-1] + y[t] for all t by doubling the reach
+    shift = 1
+    while shift < n:
+        y[shift:] += decay[shift:] * y[:-shift]
+        decay[shift:] *= decay[:-shift]
+        if not (decay[shift:] > _NEGLIGIBLE_WEIGHT).any():
+            break
+        shift *= 2
+
+    counts = seen - seen_before_block
+    y[(counts < min_periods) | (counts == 0)] = np.nan
+    return y
+
+
+def window_features(df: pd.DataFrame, windows: Mapping[str, Mapping] = DEFAULT_WINDOWS) -> Dict[str, np.ndarray]:
+    """
+    Evaluate window specs (see module docstring) over df.
+
+    Windows are computed per athlete when df has an athlete_id column; rows of
+    one athlete need not be contiguous. Returns {output name: float64 array}
+    aligned with df's rows.
+
+    Raises ValueError for an unknown kind or a column missing from df.
+    """
+    order = None
+    if ATHLETE_COLUMN in df.columns:
+        codes, _ = pd.factorize(df[ATHLETE_COLUMN], use_na_sentinel=False)
+        if (np.diff(codes) < 0).any():
+            # Interleaved athletes: compute on athlete-grouped rows, scatter back
+            order = np.argsort(codes, kind="stable")
+            codes = codes[order]
+        block_start = _block_start(codes)
+    else:
+        block_start = np.zeros(len(df), dtype=np.int64)
+
+    inputs: Dict[str, np.ndarray] = {}
+    medians: Dict[Tuple, np.ndarray] = {}
+    out: Dict[str, np.ndarray] = {}
+    for name, spec in windows.items():
+        col = spec["column"]
+        if col not in df.columns:
+            raise ValueError(f"Window '{name}' reads missing column '{col}'")
+        if col not in inputs:
+            x = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            inputs[col] = x if order is None else x[order]
+
+        kind = spec.get("kind", "mean")
+        if kind == "mean":
+            result = _rolling_mean(inputs[col], spec["window"], spec.get("min_periods", spec["window"]), block_start)
+        elif kind in ("median", "mad"):
+            # A MAD reuses the median of the same window when both are requested
+            key = (col, spec["window"], spec.get("min_periods", spec["window"]))
+            if key not in medians:
+                medians[key] = _rolling_median(inputs[col], key[1], key[2], block_start)
+            result = medians[key] if kind == "median" else _rolling_mad(inputs[col], medians[key], key[1], block_start)
+        elif kind == "ewma":
+            result = _ewma(inputs[col], spec["span"], spec.get("min_periods", 1), block_start)
+        else:
+            raise ValueError(f"Window '{name}' has unknown kind '{kind}' (expected 'mean', 'median', 'mad' or 'ewma')")
+
+        if order is not None:
+            scattered = np.empty_like(result)
+            scattered[order] = result
+            result = scattered
+        out[name] = result
+    return out